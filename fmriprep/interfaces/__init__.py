@@ -1,10 +1,154 @@
 # emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
 # vi: set ft=python sts=4 ts=4 sw=4 et:
+import shutil
+import subprocess
+
+from bids.utils import listify
+from nipype.interfaces.base import (
+    File,
+    InputMultiObject,
+    OutputMultiObject,
+    SimpleInterface,
+    TraitedSpec,
+    isdefined,
+    traits,
+)
 from niworkflows.interfaces.bids import DerivativesDataSink as _DDSink
 
 
+class _DerivativesDataSinkInputSpec(_DDSink.input_spec):
+    num_threads = traits.Int(
+        1,
+        usedefault=True,
+        nohash=True,
+        desc="Number of threads to compress NIfTI files with, if pigz is available",
+    )
+
+
 class DerivativesDataSink(_DDSink):
+    """
+    Store derivative files, compressing NIfTI outputs with ``pigz``.
+
+    The base data sink gzips NIfTI files on a single thread, recompressing inputs
+    even if they are already compressed.
+    When ``num_threads`` is larger than one and ``pigz`` is found in the ``PATH``,
+    NIfTI files that are to be compressed are instead written uncompressed by the
+    base data sink (which still fixes headers as needed), and then gzipped in place
+    with ``num_threads`` threads.
+
+    Because nipype reserves ``num_threads`` processors for the node, it should only
+    be set for sinks of large files, such as BOLD series.
+    """
+
+    input_spec = _DerivativesDataSinkInputSpec
     out_path_base = ""
 
+    def _run_interface(self, runtime):
+        pigz = shutil.which("pigz")
+        compress = listify(self.inputs.compress) or [None]
+        if pigz is None or self.inputs.num_threads < 2 or not any(compress):
+            return super()._run_interface(runtime)
+
+        n_files = len(listify(self.inputs.in_file))
+        if len(compress) == 1:
+            compress *= n_files
+        elif len(compress) != n_files:
+            raise ValueError(
+                f"Number of compress flags ({len(compress)}) does not match "
+                f"the number of input files ({n_files})"
+            )
+
+        orig_compress = self.inputs.compress
+        self.inputs.compress = [False if comp else comp for comp in compress]
+        try:
+            runtime = super()._run_interface(runtime)
+        finally:
+            self.inputs.compress = orig_compress
+
+        for idx, comp in enumerate(compress):
+            out_file = self._results["out_file"][idx]
+            if comp and out_file.endswith(".nii"):
+                subprocess.run(
+                    [pigz, "-f", "-n", "-p", str(self.inputs.num_threads), out_file],
+                    check=True,
+                )
+                self._results["out_file"][idx] = f"{out_file}.gz"
+                self._results["compression"][idx] = True
+        return runtime
+
+
+class _MultiDerivativesDataSinkInputSpec(TraitedSpec):
+    source_file = InputMultiObject(
+        File(exists=False), mandatory=True, desc="The source file of each derivative"
+    )
+    in_file = InputMultiObject(File(exists=True), mandatory=True, desc="The derivative files")
+    meta_dict = InputMultiObject(traits.Dict(), desc="Additional metadata for each derivative")
+    sink_kwargs = traits.Dict(
+        usedefault=True, desc="Keyword arguments each DerivativesDataSink is built with"
+    )
+    num_threads = traits.Int(
+        1,
+        usedefault=True,
+        nohash=True,
+        desc="Number of threads to compress NIfTI files with, if pigz is available",
+    )
+
+
+class _MultiDerivativesDataSinkOutputSpec(TraitedSpec):
+    out_file = OutputMultiObject(File(exists=True), desc="Written derivative files")
+    out_meta = OutputMultiObject(
+        File(exists=True), desc="Written JSON sidecars, in the order of out_file"
+    )
+
+
+class MultiDerivativesDataSink(SimpleInterface):
+    """
+    Store several derivatives that share the same settings, in a single node.
+
+    Each pair of ``source_file`` and ``in_file`` (and ``meta_dict``, if given) is
+    passed to a :class:`DerivativesDataSink` built with the keyword arguments this
+    interface was created with, so entities and metadata are set as for a
+    :class:`~nipype.pipeline.engine.MapNode` over a single data sink.
+    Derivatives are written one at a time, so that memory use does not grow with
+    the number of derivatives.
+    """
+
+    input_spec = _MultiDerivativesDataSinkInputSpec
+    output_spec = _MultiDerivativesDataSinkOutputSpec
+    # As DerivativesDataSink, outputs are written even if the node is cached
+    _always_run = True
+
+    def __init__(self, num_threads=1, **sink_kwargs):
+        # Build one sink up front, so that invalid arguments fail at workflow construction
+        DerivativesDataSink(**sink_kwargs)
+        # Sink arguments are an input, so that changing them invalidates cached results
+        super().__init__(num_threads=num_threads, sink_kwargs=sink_kwargs)
+
+    def _run_interface(self, runtime):
+        source_files = self.inputs.source_file
+        in_files = self.inputs.in_file
+        meta_dicts = self.inputs.meta_dict if isdefined(self.inputs.meta_dict) else None
+        if len(source_files) != len(in_files) or (
+            meta_dicts is not None and len(meta_dicts) != len(in_files)
+        ):
+            raise ValueError("Mismatched number of source files, derivatives and metadata")
+
+        results = []
+        for idx, (source_file, in_file) in enumerate(zip(source_files, in_files)):
+            sink = DerivativesDataSink(
+                num_threads=self.inputs.num_threads, **self.inputs.sink_kwargs
+            )
+            sink.inputs.source_file = source_file
+            sink.inputs.in_file = in_file
+            if meta_dicts is not None:
+                sink.inputs.meta_dict = meta_dicts[idx]
+            results.append(sink.run(cwd=runtime.cwd).outputs)
+
+        self._results["out_file"] = [result.out_file for result in results]
+        # Sidecars are only reported if every derivative has one, to keep both lists aligned
+        if all(isdefined(result.out_meta) for result in results):
+            self._results["out_meta"] = [result.out_meta for result in results]
+        return runtime
+
 
-__all__ = ("DerivativesDataSink",)
+__all__ = ("DerivativesDataSink", "MultiDerivativesDataSink")
@@ -0,0 +1,271 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+#
+# Copyright 2023 The NiPreps Developers <nipreps@gmail.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We support and encourage derived works from this project, please read
+# about our expectations at
+#
+#     https://www.nipreps.org/community/licensing/
+#
+"""
+Goodvoxels
+~~~~~~~~~~
+
+Interfaces for the HCP-style "goodvoxels" mask, which excludes voxels with
+locally high temporal coefficient of variation from surface sampling.
+
+"""
+import nibabel as nb
+import nitransforms as nt
+import numpy as np
+from nipype.interfaces.base import File, SimpleInterface, TraitedSpec, traits
+from nipype.utils.filemanip import fname_presuffix
+from scipy import ndimage as ndi
+
+from .resampling import resample_volumes
+
+
+class _MeanStdCoVInputSpec(TraitedSpec):
+    in_file = File(exists=True, mandatory=True, desc="4D BOLD series")
+
+
+class _MeanStdCoVOutputSpec(TraitedSpec):
+    mean_file = File(exists=True, desc="Temporal mean")
+    std_file = File(exists=True, desc="Temporal standard deviation")
+    cov_file = File(exists=True, desc="Temporal coefficient of variation")
+
+
+class MeanStdCoV(SimpleInterface):
+    """Calculate the temporal mean, standard deviation and coefficient of variation
+
+    The BOLD series is read only once, in blocks of volumes, so that only running
+    sums need to be held in memory. The coefficient of variation is
+    set to zero where the mean is zero.
+    """
+
+    input_spec = _MeanStdCoVInputSpec
+    output_spec = _MeanStdCoVOutputSpec
+
+    def _run_interface(self, runtime):
+        img = nb.load(self.inputs.in_file)
+        mean, std = temporal_mean_std(img)
+
+        cov = np.zeros_like(mean)
+        np.divide(std, mean, out=cov, where=mean != 0)
+
+        for name, stat in (("mean", mean), ("std", std), ("cov", cov)):
+            out_img = nb.Nifti1Image(stat, img.affine, img.header)
+            out_img.set_data_dtype(np.float32)
+            out_file = fname_presuffix(self.inputs.in_file, suffix=f"_{name}", newpath=runtime.cwd)
+            out_img.to_filename(out_file)
+            self._results[f"{name}_file"] = out_file
+
+        return runtime
+
+
+def temporal_mean_std(
+    img: nb.spatialimages.SpatialImage,
+    block_size: int = 2**28,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Calculate the temporal mean and (sample) standard deviation of a 4D image
+
+    Volumes are read in blocks of at most ``block_size`` bytes (as float32), and
+    accumulated as sums of deviations from the first volume in double precision,
+    which avoids the cancellation of the naive sum-of-squares formula.
+
+    Parameters
+    ----------
+    img
+        The 4D image
+    block_size
+        Approximate number of bytes to read at once
+
+    Returns
+    -------
+    mean
+        The temporal mean, as float32
+    std
+        The temporal standard deviation, as float32
+    """
+    nvols = img.shape[3]
+    step = max(block_size // (int(np.prod(img.shape[:3])) * 4), 1)
+
+    # Shifting in float32 keeps blocks in single precision; sums are accumulated in double
+    shift = np.asanyarray(img.dataobj[..., 0], dtype=np.float32)
+    sum1 = np.zeros(shift.shape, dtype=np.float64)
+    sum2 = np.zeros(shift.shape, dtype=np.float64)
+    for start in range(0, nvols, step):
+        block = np.asanyarray(img.dataobj[..., start : start + step], dtype=np.float32)
+        block = block - shift[..., np.newaxis]
+        sum1 += block.sum(axis=-1, dtype=np.float64)
+        sum2 += np.square(block).sum(axis=-1, dtype=np.float64)
+
+    mean = shift + sum1 / nvols
+    var = (sum2 - sum1**2 / nvols) / max(nvols - 1, 1)
+    return mean.astype(np.float32), np.sqrt(np.maximum(var, 0)).astype(np.float32)
+
+
+class _GoodVoxelsMaskInputSpec(TraitedSpec):
+    mean_file = File(exists=True, mandatory=True, desc="Temporal mean of the BOLD series")
+    cov_file = File(
+        exists=True, mandatory=True, desc="Temporal coefficient of variation of the BOLD series"
+    )
+    anat_ribbon = File(exists=True, mandatory=True, desc="Cortical ribbon mask")
+    smoothing = traits.Float(
+        5.0, usedefault=True, desc="Standard deviation (in mm) of the neighborhood Gaussian"
+    )
+
+
+class _GoodVoxelsMaskOutputSpec(TraitedSpec):
+    goodvoxels_mask = File(exists=True, desc="Mask excluding voxels with locally high COV")
+    goodvoxels_ribbon = File(
+        exists=True, desc="Cortical ribbon mask excluding voxels with locally high COV"
+    )
+    upper_thresh = traits.Float(desc="Modulated COV above which voxels are excluded")
+
+
+class GoodVoxelsMask(SimpleInterface):
+    """Calculate a mask of voxels excluding those with locally high COV
+
+    This is an in-process implementation of the ``fslmaths``/``fslstats`` recipe in
+    the HCP ``RibbonVolumeToSurfaceMapping.sh`` script.
+    The COV is normalized by its mean within the cortical ribbon, and modulated by a
+    Gaussian-weighted average of the normalized COV in the ribbon neighborhood,
+    extended by one voxel with a modal dilation (``-dilD``).
+    Voxels whose modulated COV exceeds the ribbon mean by more than half a (sample)
+    standard deviation are excluded, as are voxels outside the brain (zero mean).
+    The cortical ribbon is resampled onto the BOLD grid with nearest-neighbor
+    interpolation, unless both already share the same grid.
+    """
+
+    input_spec = _GoodVoxelsMaskInputSpec
+    output_spec = _GoodVoxelsMaskOutputSpec
+
+    def _run_interface(self, runtime):
+        mean_img = nb.load(self.inputs.mean_file)
+        mean = mean_img.get_fdata(dtype=np.float32)
+        cov = nb.load(self.inputs.cov_file).get_fdata(dtype=np.float32)
+
+        ribbon_img = nb.load(self.inputs.anat_ribbon)
+        # Anatomical derivatives are frequently on the BOLD grid already
+        if ribbon_img.shape[:3] != mean_img.shape[:3] or not np.allclose(
+            ribbon_img.affine, mean_img.affine
+        ):
+            ribbon_img = resample_volumes(
+                sources=[ribbon_img],
+                target=mean_img,
+                transforms=nt.base.TransformBase(),
+                orders=[0],
+            )[0]
+        ribbon = np.asanyarray(ribbon_img.dataobj) > 0
+
+        sigma = self.inputs.smoothing / np.array(mean_img.header.get_zooms()[:3])
+        goodvoxels, self._results["upper_thresh"] = goodvoxels_mask(mean, cov, ribbon, sigma)
+
+        for name, mask in (
+            ("goodvoxels_mask", goodvoxels),
+            ("goodvoxels_ribbon", goodvoxels & ribbon),
+        ):
+            out_img = nb.Nifti1Image(mask.astype(np.uint8), mean_img.affine, mean_img.header)
+            out_img.set_data_dtype(np.uint8)
+            out_file = fname_presuffix(
+                self.inputs.mean_file, suffix=f"_{name}", newpath=runtime.cwd
+            )
+            out_img.to_filename(out_file)
+            self._results[name] = out_file
+
+        return runtime
+
+
+def goodvoxels_mask(
+    mean: np.ndarray,
+    cov: np.ndarray,
+    ribbon: np.ndarray,
+    sigma: float | np.ndarray,
+) -> tuple[np.ndarray, float]:
+    """Calculate a mask of voxels excluding those with locally high COV
+
+    Parameters
+    ----------
+    mean
+        Temporal mean of the BOLD series
+    cov
+        Temporal coefficient of variation of the BOLD series
+    ribbon
+        Boolean mask of the cortical ribbon, on the same grid as ``mean`` and ``cov``
+    sigma
+        Standard deviation of the neighborhood Gaussian, in voxels
+
+    Returns
+    -------
+    goodvoxels
+        Boolean mask of voxels with nonzero mean and no locally high COV
+    upper_thresh
+        Modulated COV above which voxels are excluded
+    """
+    # As fslstats -M/-S, ribbon statistics are calculated over nonzero voxels,
+    # and the standard deviation is the sample standard deviation.
+    # Ribbon voxels are indexed directly, rather than from masked copies of each volume.
+    cov_ribbon = cov[ribbon]
+    ribbon_mean = cov_ribbon[cov_ribbon != 0].mean()
+    cov_ribbon_norm = np.zeros_like(cov)
+    cov_ribbon_norm[ribbon] = cov_ribbon / ribbon_mean
+
+    # Gaussian-weighted average of the normalized COV within the ribbon (fslmaths -s),
+    # extended by one voxel with a modal dilation (fslmaths -dilD)
+    weights = ndi.gaussian_filter((cov_ribbon_norm > 0).astype(np.float32), sigma, mode='constant')
+    smooth = ndi.gaussian_filter(cov_ribbon_norm, sigma, mode='constant')
+    cov_ribbon_norm_smooth = _safe_divide(smooth, weights)
+    cov_ribbon_norm_smooth = _dilate_modal(cov_ribbon_norm_smooth)
+
+    cov_norm_modulate = _safe_divide(cov / ribbon_mean, cov_ribbon_norm_smooth)
+    mod_ribbon = cov_norm_modulate[ribbon]
+    mod_ribbon = mod_ribbon[mod_ribbon != 0]
+    upper_thresh = float(mod_ribbon.mean() + mod_ribbon.std(ddof=1) * 0.5)
+
+    return (mean > 0) & ~(cov_norm_modulate >= upper_thresh), upper_thresh
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Divide arrays, returning zero where the denominator is zero (as ``fslmaths -div``)"""
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _dilate_modal(data: np.ndarray) -> np.ndarray:
+    """Fill zero voxels with the mode of their nonzero neighbors (as ``fslmaths -dilD``)
+
+    Neighbors are taken from a 3x3x3 box. Ties, which are the rule for continuous
+    data, are resolved to the largest value.
+    """
+    nonzero = data != 0
+    fill = ~nonzero & ndi.binary_dilation(nonzero, structure=np.ones((3, 3, 3), dtype=bool))
+    out = data.copy()
+    if not fill.any():
+        return out
+
+    padded = np.pad(data, 1)
+    i, j, k = np.nonzero(fill)
+    neighbors = np.stack(
+        [padded[i + di, j + dj, k + dk] for di, dj, dk in np.ndindex(3, 3, 3)], axis=-1
+    )
+    neighbors[neighbors == 0] = np.nan
+    # NaNs never compare equal, so zero neighbors are never counted
+    counts = (neighbors[..., np.newaxis] == neighbors[..., np.newaxis, :]).sum(axis=-1)
+    modes = np.where(counts == counts.max(axis=-1, keepdims=True), neighbors, -np.inf)
+    out[fill] = modes.max(axis=-1)
+    return out
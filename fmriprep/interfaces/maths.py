@@ -82,3 +82,58 @@ class Label2Mask(SimpleInterface):
 
         self._results["out_file"] = out_file
         return runtime
+
+
+class SetDataTypeInputSpec(TraitedSpec):
+    in_file = File(exists=True, mandatory=True, desc="Input imaging file")
+    dtype = traits.Str(mandatory=True, desc="NumPy data type to store the data on disk as")
+    uncompress = traits.Bool(False, usedefault=True, desc="Write an uncompressed NIfTI file")
+
+
+class SetDataTypeOutputSpec(TraitedSpec):
+    out_file = File(desc="Output file name")
+
+
+class SetDataType(SimpleInterface):
+    """Change the on-disk data type of an image
+
+    Floating-point data stored as an integer type are scaled by nibabel,
+    which sets ``scl_slope``/``scl_inter`` to preserve the dynamic range of the data.
+    If the image is already stored with the requested type (and is uncompressed, if
+    ``uncompress`` is requested), the in_file is passed as the out_file without copying.
+    """
+
+    input_spec = SetDataTypeInputSpec
+    output_spec = SetDataTypeOutputSpec
+
+    def _run_interface(self, runtime):
+        import nibabel as nb
+
+        img = nb.load(self.inputs.in_file)
+        dtype = np.dtype(self.inputs.dtype)
+        decompress = self.inputs.uncompress and self.inputs.in_file.endswith(".gz")
+
+        out_file = fname_presuffix(self.inputs.in_file, suffix=f"_{dtype}", newpath=runtime.cwd)
+        if decompress:
+            out_file = out_file[:-3]
+
+        if img.get_data_dtype() == dtype:
+            if decompress:
+                img.to_filename(out_file)
+            else:
+                out_file = self.inputs.in_file
+            self._results["out_file"] = out_file
+            return runtime
+
+        if np.issubdtype(dtype, np.integer):
+            # Let nibabel find the scale factors for the stored type
+            data = img.get_fdata(dtype=np.float32)
+        else:
+            data = img.get_fdata(dtype=dtype)
+
+        out_img = img.__class__(data, img.affine, img.header)
+        out_img.set_data_dtype(dtype)
+        out_img.to_filename(out_file)
+
+        self._results["out_file"] = out_file
+        return runtime
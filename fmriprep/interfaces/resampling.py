@@ -10,6 +10,7 @@ import numpy as np
 from nipype.interfaces.base import (
     File,
     InputMultiObject,
+    OutputMultiObject,
     SimpleInterface,
     TraitedSpec,
     traits,
@@ -118,6 +119,86 @@ class ResampleSeries(SimpleInterface):
         return runtime
 
 
+class ResampleVolumesInputSpec(TraitedSpec):
+    in_files = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="3D image files to resample, all sharing the same transforms",
+    )
+    ref_file = File(exists=True, mandatory=True, desc="File to resample in_files to")
+    transforms = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="Transform files, from in_files to ref_file (image mode)",
+    )
+    inverse = InputMultiObject(
+        traits.Bool,
+        value=[False],
+        usedefault=True,
+        desc="Whether to invert each file in transforms",
+    )
+    order = InputMultiObject(
+        traits.Int,
+        value=[3],
+        usedefault=True,
+        desc="Order of interpolation for each file in in_files (0=nearest, 3=cubic)",
+    )
+    mode = traits.Str(
+        'constant',
+        usedefault=True,
+        desc="How data is extended beyond its boundaries. "
+        "See scipy.ndimage.map_coordinates for more details.",
+    )
+    cval = traits.Float(0.0, usedefault=True, desc="Value to fill past edges of data")
+    num_threads = traits.Int(1, usedefault=True, desc="Number of threads to use for resampling")
+
+
+class ResampleVolumesOutputSpec(TraitedSpec):
+    out_files = OutputMultiObject(File(exists=True), desc="Resampled images, in input order")
+
+
+class ResampleVolumes(SimpleInterface):
+    """Resample several 3D images into a target space with a shared set of transforms.
+
+    The target grid is mapped through the transforms only once, and the resulting
+    coordinates are reused to sample every input image.
+    """
+
+    input_spec = ResampleVolumesInputSpec
+    output_spec = ResampleVolumesOutputSpec
+
+    def _run_interface(self, runtime):
+        in_files = self.inputs.in_files
+        orders = list(self.inputs.order)
+        if len(orders) == 1:
+            orders = orders * len(in_files)
+        elif len(orders) != len(in_files):
+            raise ValueError("Mismatched number of input files and interpolation orders")
+
+        target = nb.load(self.inputs.ref_file)
+        transforms = load_transforms(self.inputs.transforms, self.inputs.inverse)
+
+        resampled = resample_volumes(
+            sources=[nb.load(in_file) for in_file in in_files],
+            target=target,
+            transforms=transforms,
+            orders=orders,
+            mode=self.inputs.mode,
+            cval=self.inputs.cval,
+            nthreads=self.inputs.num_threads,
+        )
+
+        self._results['out_files'] = []
+        for idx, (in_file, img) in enumerate(zip(in_files, resampled)):
+            out_path = fname_presuffix(in_file, suffix='resampled', newpath=runtime.cwd)
+            if out_path in self._results['out_files']:
+                out_path = fname_presuffix(out_path, suffix=str(idx))
+            img.to_filename(out_path)
+            self._results['out_files'].append(out_path)
+
+        return runtime
+
+
 class ReconstructFieldmapInputSpec(TraitedSpec):
     in_coeffs = InputMultiObject(
         File(exists=True), mandatory=True, desc="SDCflows-style spline coefficient files"
@@ -581,6 +662,98 @@ def resample_image(
     return resampled_img
 
 
+def resample_volumes(
+    sources: list[nb.Nifti1Image],
+    target: nb.Nifti1Image,
+    transforms: nt.base.TransformBase,
+    orders: list[int],
+    mode: str = 'constant',
+    cval: float = 0.0,
+    nthreads: int = 1,
+) -> list[nb.Nifti1Image]:
+    """Resample several 3D images into a target space with shared transforms.
+
+    Mapping the target grid through the transforms is the costly part of
+    resampling, particularly when a displacement field is involved.
+    It is performed once, and the source coordinates are reused for every image.
+
+    Parameters
+    ----------
+    sources
+        The 3D images to resample.
+    target
+        An image sampled in the target space.
+    transforms
+        A nitransforms transform that maps images from the source space
+        into the target space.
+    orders
+        Order of interpolation for each image in ``sources``. Images sampled
+        with nearest-neighbor interpolation (order 0) retain their data type.
+    mode
+        How data are extended beyond their boundaries. See
+        :func:`scipy.ndimage.map_coordinates` for more details.
+    cval
+        Value to fill past edges of data if ``mode`` is ``'constant'``.
+    nthreads
+        Number of images to resample concurrently
+
+    Returns
+    -------
+    resampled_images
+        The images in ``sources``, resampled into the target space
+    """
+    # A chain of affines is folded into a single VOX2VOX matrix per source grid,
+    # so target coordinates are only transformed once, regardless of chain length
+    xfm = as_affine(transforms)
+    if xfm is None:
+        # Retrieve the RAS coordinates of the target space, and map them into the source space
+        coordinates = nt.base.SpatialReference.factory(target).ndcoords.astype('f4').T
+        mapped_coordinates = transforms.map(coordinates)
+    else:
+        target_indices = np.indices(target.shape[:3], dtype='f4').reshape(3, -1).T
+
+    voxel_coordinates = {}
+    for source in sources:
+        # Images sharing a grid (the common case) share voxel coordinates as well
+        key = source.affine.tobytes()
+        if key in voxel_coordinates:
+            continue
+        ras2vox = np.linalg.inv(source.affine)
+        if xfm is None:
+            source_coordinates = nb.affines.apply_affine(ras2vox, mapped_coordinates)
+        else:
+            vox2vox = ras2vox @ xfm.matrix @ target.affine
+            source_coordinates = nb.affines.apply_affine(vox2vox, target_indices)
+        voxel_coordinates[key] = source_coordinates.T.reshape((3, *target.shape[:3]))
+
+    def _resample(source: nb.Nifti1Image, order: int) -> nb.Nifti1Image:
+        data = np.asanyarray(source.dataobj) if order == 0 else source.get_fdata(dtype='f4')
+        resampled_data = ndi.map_coordinates(
+            data,
+            voxel_coordinates[source.affine.tobytes()],
+            order=order,
+            mode=mode,
+            cval=cval,
+        )
+        resampled_img = nb.Nifti1Image(resampled_data, target.affine, target.header)
+        resampled_img.set_data_dtype(resampled_data.dtype)
+        return resampled_img
+
+    if nthreads < 2 or len(sources) < 2:
+        return [_resample(source, order) for source, order in zip(sources, orders)]
+
+    async def _resample_all() -> list[nb.Nifti1Image]:
+        semaphore = asyncio.Semaphore(nthreads)
+        return await asyncio.gather(
+            *(
+                worker(partial(_resample, source, order), semaphore)
+                for source, order in zip(sources, orders)
+            )
+        )
+
+    return asyncio.run(_resample_all())
+
+
 def aligned(aff1: np.ndarray, aff2: np.ndarray) -> bool:
     """Determine if two affines have aligned grids"""
     return np.allclose(
@@ -0,0 +1,132 @@
+import json
+import shutil
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+import pytest
+from nipype.pipeline import engine as pe
+from traits.api import TraitError
+
+from fmriprep.interfaces import DerivativesDataSink, MultiDerivativesDataSink
+
+
+def _write_nifti(fname, data):
+    img = nb.Nifti1Image(data, np.eye(4))
+    # A header that needs no fixing, so the data sink copies the file as given
+    img.set_qform(np.eye(4), 1)
+    img.set_sform(np.eye(4), 1)
+    img.header.set_xyzt_units("mm")
+    img.to_filename(fname)
+
+
+@pytest.mark.skipif(shutil.which("pigz") is None, reason="pigz is not available")
+@pytest.mark.parametrize("in_name", ["input.nii", "input.nii.gz"])
+def test_DerivativesDataSink_pigz(tmp_path, monkeypatch, in_name):
+    monkeypatch.chdir(tmp_path)
+    in_file = tmp_path / in_name
+    data = np.arange(4 * 5 * 6, dtype=np.uint8).reshape((4, 5, 6))
+    _write_nifti(in_file, data)
+
+    def _sink(**kwargs):
+        sink = DerivativesDataSink(
+            base_directory=str(tmp_path / "derivatives"),
+            desc="brain",
+            suffix="mask",
+            num_threads=2,
+            **kwargs,
+        )
+        sink.inputs.in_file = str(in_file)
+        sink.inputs.source_file = "sub-01/func/sub-01_task-rest_bold.nii.gz"
+        return sink
+
+    out_file = tmp_path / "derivatives/sub-01/func/sub-01_task-rest_desc-brain_mask.nii.gz"
+    sink = _sink(compress=True)
+    ret = sink.run()
+
+    assert ret.outputs.out_file == str(out_file)
+    assert ret.outputs.compression is True
+    # The compress flags are restored, and no uncompressed copy is left behind
+    assert sink.inputs.compress == [True]
+    assert not out_file.with_suffix("").exists()
+    assert out_file.read_bytes()[:2] == b"\x1f\x8b"
+    assert np.array_equal(np.asanyarray(nb.load(out_file).dataobj), data)
+
+    # Without compress flags, the extension of the input is kept
+    ret = _sink().run()
+    assert ret.outputs.out_file == str(out_file)[: -len(".nii.gz")] + in_name[len("input") :]
+
+    with pytest.raises(ValueError):
+        _sink(compress=[True, False]).run()
+
+
+def test_MultiDerivativesDataSink(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source_files = [f"sub-01/func/sub-01_task-rest_echo-{echo}_bold.nii.gz" for echo in (1, 2)]
+    in_files = []
+    for echo in (1, 2):
+        in_files.append(str(tmp_path / f"echo{echo}.nii.gz"))
+        _write_nifti(in_files[-1], np.full((2, 2, 2, 3), echo, dtype=np.int16))
+
+    with pytest.raises(TraitError):
+        MultiDerivativesDataSink(check_hdr="yes")
+
+    sink = MultiDerivativesDataSink(
+        base_directory=str(tmp_path / "derivatives"),
+        desc="preproc",
+        compress=True,
+        SkullStripped=False,
+    )
+    sink.inputs.source_file = source_files
+    sink.inputs.in_file = in_files
+    sink.inputs.meta_dict = [{"EchoTime": 0.015}]
+    with pytest.raises(ValueError):
+        sink.run()
+
+    sink.inputs.meta_dict = [{"EchoTime": 0.015}, {"EchoTime": 0.035}]
+    ret = sink.run()
+
+    out_dir = tmp_path / "derivatives/sub-01/func"
+    assert ret.outputs.out_file == [
+        str(out_dir / f"sub-01_task-rest_echo-{echo}_desc-preproc_bold.nii.gz") for echo in (1, 2)
+    ]
+    assert ret.outputs.out_meta == [
+        str(out_dir / f"sub-01_task-rest_echo-{echo}_desc-preproc_bold.json") for echo in (1, 2)
+    ]
+    for echo, out_file, out_meta, echo_time in zip(
+        (1, 2), ret.outputs.out_file, ret.outputs.out_meta, (0.015, 0.035)
+    ):
+        assert np.all(np.asanyarray(nb.load(out_file).dataobj) == echo)
+        metadata = json.loads(Path(out_meta).read_text())
+        assert metadata["EchoTime"] == echo_time
+        assert metadata["SkullStripped"] is False
+
+
+def test_MultiDerivativesDataSink_rerun(tmp_path):
+    source_files = [f"sub-01/func/sub-01_task-rest_echo-{echo}_bold.nii.gz" for echo in (1, 2)]
+    in_files = []
+    for echo in (1, 2):
+        in_files.append(str(tmp_path / f"echo{echo}.nii.gz"))
+        _write_nifti(in_files[-1], np.full((2, 2, 2, 3), echo, dtype=np.int16))
+
+    def _sink(output_dir):
+        node = pe.Node(
+            MultiDerivativesDataSink(base_directory=str(output_dir), desc="preproc"),
+            name="ds_bold_echos",
+            base_dir=str(tmp_path / "work"),
+        )
+        node.inputs.source_file = source_files
+        node.inputs.in_file = in_files
+        return node
+
+    out_files = _sink(tmp_path / "derivatives").run().outputs.out_file
+    for out_file in out_files:
+        Path(out_file).unlink()
+
+    # Derivatives are written again, even though the node is cached
+    _sink(tmp_path / "derivatives").run()
+    assert all(Path(out_file).exists() for out_file in out_files)
+
+    # Changing the sink arguments changes the node's hash
+    hashes = [_sink(tmp_path / name).inputs.get_hashval()[1] for name in ("deriv1", "deriv2")]
+    assert hashes[0] != hashes[1]
@@ -0,0 +1,131 @@
+import nibabel as nb
+import numpy as np
+import pytest
+from nipype.pipeline import engine as pe
+
+from fmriprep.interfaces.goodvoxels import (
+    GoodVoxelsMask,
+    MeanStdCoV,
+    _dilate_modal,
+    goodvoxels_mask,
+    temporal_mean_std,
+)
+
+
+def test_MeanStdCoV(tmp_path):
+    in_file = str(tmp_path / "bold.nii")
+    rng = np.random.default_rng(1234)
+    data = rng.normal(100, 5, size=(4, 4, 4, 20)).astype(np.float32)
+    data[0, 0, 0] = 0
+    nb.Nifti1Image(data, np.eye(4)).to_filename(in_file)
+
+    stats = pe.Node(MeanStdCoV(in_file=in_file), name="stats", base_dir=tmp_path)
+
+    ret = stats.run()
+
+    mean = nb.load(ret.outputs.mean_file).get_fdata()
+    std = nb.load(ret.outputs.std_file).get_fdata()
+    cov = nb.load(ret.outputs.cov_file).get_fdata()
+    assert mean.shape == (4, 4, 4)
+    assert np.allclose(mean, data.mean(-1), rtol=1e-5)
+    assert np.allclose(std, data.std(-1, ddof=1), rtol=1e-4)
+    assert cov[0, 0, 0] == 0
+    assert np.allclose(cov[1:], std[1:] / mean[1:])
+
+
+def test_temporal_mean_std():
+    rng = np.random.default_rng(1234)
+    data = rng.normal(1000, 5, size=(4, 4, 4, 20)).astype(np.float32)
+    img = nb.Nifti1Image(data, np.eye(4))
+
+    # Three volumes per block, with a shorter last block
+    mean, std = temporal_mean_std(img, block_size=3 * data[..., 0].nbytes)
+
+    assert mean.dtype == std.dtype == np.float32
+    assert np.allclose(mean, data.mean(-1, dtype=np.float64), rtol=1e-6)
+    assert np.allclose(std, data.std(-1, ddof=1, dtype=np.float64), rtol=1e-4)
+
+
+@pytest.mark.parametrize("ribbon_zoom", [1.0, 0.5])
+def test_GoodVoxelsMask(tmp_path, ribbon_zoom):
+    mean = np.full((10, 10, 10), 100, dtype=np.float32)
+    mean[0, 0, 0] = 0
+    cov = np.full((10, 10, 10), 0.05, dtype=np.float32)
+    cov[0, 0, 0] = 0
+    cov[5, 5, 5] = 0.5
+    # A ribbon on a finer grid is resampled onto the BOLD grid
+    scale = round(1 / ribbon_zoom)
+    ribbon = np.zeros((10 * scale,) * 3, dtype=np.uint8)
+    ribbon[3 * scale : 8 * scale, 3 * scale : 8 * scale, 3 * scale : 8 * scale] = 1
+
+    files = {}
+    for name, data, zoom in (
+        ("mean", mean, 1.0),
+        ("cov", cov, 1.0),
+        ("ribbon", ribbon, ribbon_zoom),
+    ):
+        files[name] = str(tmp_path / f"{name}.nii")
+        nb.Nifti1Image(data, np.diag([zoom, zoom, zoom, 1])).to_filename(files[name])
+
+    goodvoxels = pe.Node(
+        GoodVoxelsMask(
+            mean_file=files["mean"],
+            cov_file=files["cov"],
+            anat_ribbon=files["ribbon"],
+        ),
+        name="goodvoxels",
+        base_dir=tmp_path,
+    )
+
+    ret = goodvoxels.run()
+
+    mask = np.asanyarray(nb.load(ret.outputs.goodvoxels_mask).dataobj)
+    ribbon_mask = np.asanyarray(nb.load(ret.outputs.goodvoxels_ribbon).dataobj)
+    expected = np.ones((10, 10, 10), dtype=np.uint8)
+    expected[0, 0, 0] = 0
+    expected[5, 5, 5] = 0
+    assert np.array_equal(mask, expected)
+    assert np.array_equal(ribbon_mask, expected * ribbon[::scale, ::scale, ::scale])
+    assert ret.outputs.upper_thresh > 1
+
+
+def test_goodvoxels_mask_nonuniform():
+    shape = (16, 16, 16)
+    mean = np.full(shape, 100, dtype=np.float32)
+    mean[15, 15, 15] = 0
+    # COV increasing along y within a slab of ribbon, uniform elsewhere
+    cov = np.full(shape, 0.02, dtype=np.float32)
+    ribbon = np.zeros(shape, dtype=bool)
+    ribbon[2:6] = True
+    cov[2:6] += 0.002 * np.arange(16, dtype=np.float32)[:, np.newaxis]
+    # Locally high COV in the ribbon, in the voxels reached by the dilation
+    # of the smoothed ribbon COV (x = 10), and beyond them (x = 12)
+    cov[3, 8, 8] = cov[10, 8, 8] = cov[12, 8, 8] = 0.5
+
+    mask, upper_thresh = goodvoxels_mask(mean, cov, ribbon, sigma=1.0)
+
+    assert 1 < upper_thresh < 2
+    assert not mask[15, 15, 15]
+    assert not mask[3, 8, 8]
+    assert not mask[10, 8, 8]
+    # The modulating neighborhood average is zero, so the COV cannot be compared
+    assert mask[12, 8, 8]
+    assert mask[4, 3, 12]
+    assert mask[0, 8, 8]
+
+
+def test_dilate_modal():
+    data = np.zeros((3, 3, 3), dtype=np.float32)
+    data[0, 0] = [1, 1, 4]
+    out = _dilate_modal(data)
+    # The most frequent neighbor value, not the mean (2)
+    assert out[1, 1, 1] == 1
+    assert np.array_equal(out[0, 0], data[0, 0])
+
+    data = np.zeros((3, 3, 3), dtype=np.float32)
+    data[0, 0, 0] = 2
+    data[2, 2, 2] = 3
+    out = _dilate_modal(data)
+    # Ties are resolved to the largest value
+    assert out[1, 1, 1] == 3
+    assert out[0, 0, 1] == 2
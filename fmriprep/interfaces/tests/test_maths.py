@@ -2,7 +2,7 @@ import nibabel as nb
 import numpy as np
 from nipype.pipeline import engine as pe
 
-from fmriprep.interfaces.maths import Clip
+from fmriprep.interfaces.maths import Clip, SetDataType
 
 
 def test_Clip(tmp_path):
@@ -41,3 +41,39 @@ def test_Clip(tmp_path):
     assert ret.outputs.out_file == str(tmp_path / "nonpositive/input_clipped.nii")
     out_img = nb.load(ret.outputs.out_file)
     assert np.allclose(out_img.get_fdata(), [[[-1.0, 0.0], [-2.0, 0.0]]])
+
+
+def test_SetDataType(tmp_path):
+    in_file = str(tmp_path / "input.nii")
+    data = np.array([[[0.0, 0.0123], [0.0456, 0.2]]], dtype=np.float32)
+    nb.Nifti1Image(data, np.eye(4)).to_filename(in_file)
+
+    quantize = pe.Node(
+        SetDataType(in_file=in_file, dtype="int16"), name="quantize", base_dir=tmp_path
+    )
+
+    ret = quantize.run()
+
+    assert ret.outputs.out_file == str(tmp_path / "quantize/input_int16.nii")
+    out_img = nb.load(ret.outputs.out_file)
+    assert out_img.get_data_dtype() == np.int16
+    assert np.allclose(out_img.get_fdata(), data, atol=1e-5)
+
+    noop = pe.Node(SetDataType(in_file=in_file, dtype="float32"), name="noop", base_dir=tmp_path)
+
+    ret = noop.run()
+
+    assert ret.outputs.out_file == in_file
+
+    gz_file = str(tmp_path / "input.nii.gz")
+    nb.Nifti1Image(data, np.eye(4)).to_filename(gz_file)
+    uncompress = pe.Node(
+        SetDataType(in_file=gz_file, dtype="float32", uncompress=True),
+        name="uncompress",
+        base_dir=tmp_path,
+    )
+
+    ret = uncompress.run()
+
+    assert ret.outputs.out_file == str(tmp_path / "uncompress/input_float32.nii")
+    assert np.array_equal(nb.load(ret.outputs.out_file).get_fdata(dtype=np.float32), data)
@@ -0,0 +1,87 @@
+import nibabel as nb
+import nitransforms as nt
+import numpy as np
+from nipype.interfaces import utility as niu
+from nipype.pipeline import engine as pe
+
+from fmriprep.interfaces import resampling
+
+
+def test_resample_volumes_affine_chain(monkeypatch):
+    rng = np.random.default_rng(1234)
+    source = nb.Nifti1Image(
+        rng.random((10, 12, 14), dtype=np.float32),
+        nb.affines.from_matvec(np.diag([2.0, 2.0, 2.5]), [-10, -12, -17]),
+    )
+    target = nb.Nifti1Image(
+        np.zeros((8, 9, 10), dtype=np.float32),
+        nb.affines.from_matvec(np.eye(3) * 2.2, [-8, -9, -10]),
+    )
+    cos, sin = np.cos(0.1), np.sin(0.1)
+    rotation = np.array([[cos, -sin, 0], [sin, cos, 0], [0, 0, 1]])
+    chain = nt.TransformChain(
+        [
+            nt.Affine(nb.affines.from_matvec(rotation, [1.5, -2, 0.5])),
+            nt.Affine(nb.affines.from_matvec(np.eye(3), [0.3, 0.2, -0.4])),
+        ]
+    )
+
+    folded = resampling.resample_volumes([source], target, chain, orders=[1], mode='nearest')
+
+    # Force the chain through transforms.map, as for non-affine transforms
+    monkeypatch.setattr(resampling, "as_affine", lambda xfm: None)
+    mapped = resampling.resample_volumes([source], target, chain, orders=[1], mode='nearest')
+
+    assert np.allclose(folded[0].get_fdata(), mapped[0].get_fdata(), atol=1e-4)
+
+
+def test_ResampleVolumes(tmp_path):
+    affine = nb.affines.from_matvec(np.eye(3) * 2, [-8, -8, -8])
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    ref_file = str(tmp_path / "a/image.nii.gz")
+    mask_file = str(tmp_path / "b/image.nii.gz")
+    data = np.linspace(0, 1, 9**3, dtype=np.float32).reshape((9, 9, 9))
+    nb.Nifti1Image(data, affine).to_filename(ref_file)
+    nb.Nifti1Image((data > 0.5).astype(np.uint8), affine).to_filename(mask_file)
+
+    xfm_file = str(tmp_path / "xfm.txt")
+    nt.Affine(nb.affines.from_matvec(np.eye(3), [2, 0, 0])).to_filename(xfm_file, fmt="itk")
+
+    resample = pe.Node(
+        resampling.ResampleVolumes(
+            in_files=[ref_file, mask_file],
+            ref_file=ref_file,
+            transforms=[xfm_file],
+            order=[3, 0],
+        ),
+        name="resample",
+        base_dir=tmp_path,
+    )
+
+    ret = resample.run()
+
+    # Inputs with the same name are written to different files
+    assert ret.outputs.out_files == [
+        str(tmp_path / "resample/imageresampled.nii.gz"),
+        str(tmp_path / "resample/imageresampled1.nii.gz"),
+    ]
+    ref_img, mask_img = (nb.load(out_file) for out_file in ret.outputs.out_files)
+    assert ref_img.get_data_dtype() == np.float32
+    # Nearest-neighbor interpolation preserves the data type and labels
+    assert mask_img.get_data_dtype() == np.uint8
+    mask = np.asanyarray(mask_img.dataobj)
+    assert set(np.unique(mask)) <= {0, 1}
+    assert mask.sum() > 0
+
+    # A single input is squeezed, and several inputs split into one image each
+    single = pe.Node(
+        resampling.ResampleVolumes(in_files=[ref_file], ref_file=ref_file, transforms=[xfm_file]),
+        name="single",
+        base_dir=tmp_path,
+    )
+    assert single.run().outputs.out_files == str(tmp_path / "single/imageresampled.nii.gz")
+
+    split = niu.Split(inlist=ret.outputs.out_files, splits=[1, 1], squeeze=True).run()
+    assert split.outputs.out1 == ret.outputs.out_files[0]
+    assert split.outputs.out2 == ret.outputs.out_files[1]
@@ -2,17 +2,22 @@
 # vi: set ft=python sts=4 ts=4 sw=4 et:
 """This module provides interfaces for workbench surface commands."""
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from nipype import logging
 from nipype.interfaces.base import (
     CommandLine,
     CommandLineInputSpec,
     File,
+    InputMultiObject,
+    OutputMultiObject,
+    SimpleInterface,
     TraitedSpec,
     isdefined,
     traits,
 )
 from nipype.interfaces.workbench.base import WBCommand
+from nipype.utils.filemanip import split_filename
 
 iflogger = logging.getLogger("nipype.interface")
 
@@ -607,6 +612,106 @@ class VolumeToSurfaceMapping(WBCommand, OpenMPCommandMixin):
         return outputs
 
 
+class VolumeToSurfaceMappingLRInputSpec(TraitedSpec):
+    volume_file = File(exists=True, mandatory=True, desc="the volume to map data from")
+    surface_files = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="the surfaces to map the data onto, one per hemisphere",
+    )
+    inner_surfaces = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="the inner surfaces of the ribbon, one per hemisphere",
+    )
+    outer_surfaces = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="the outer surfaces of the ribbon, one per hemisphere",
+    )
+    volume_roi = File(
+        exists=True,
+        desc="use a volume roi, ignoring voxels without a positive value in the mask",
+    )
+    num_threads = traits.Int(2, usedefault=True, desc="total number of threads to use")
+
+
+class VolumeToSurfaceMappingLROutputSpec(TraitedSpec):
+    out_files = OutputMultiObject(File(exists=True), desc="the output metric files")
+
+
+class VolumeToSurfaceMappingLR(SimpleInterface):
+    """Map a volume onto the surfaces of both hemispheres with the ribbon-constrained method.
+
+    One :class:`VolumeToSurfaceMapping` is run per hemisphere, sharing ``num_threads``
+    between them, or one after the other if fewer than two threads are available.
+    Both processes read the same volume file, so the second read is generally
+    served from the operating system's page cache.
+    Surfaces are given in (left, right) order, and each output is named after
+    the volume and its hemisphere.
+
+    Examples
+
+    >>> from fmriprep.interfaces.workbench import VolumeToSurfaceMappingLR
+    >>> vol2surf = VolumeToSurfaceMappingLR()
+    >>> vol2surf.inputs.volume_file = 'bold.nii.gz'
+    >>> vol2surf.inputs.surface_files = ['lh.midthickness.surf.gii', 'rh.midthickness.surf.gii']
+    >>> vol2surf.inputs.inner_surfaces = ['lh.white.surf.gii', 'rh.white.surf.gii']
+    >>> vol2surf.inputs.outer_surfaces = ['lh.pial.surf.gii', 'rh.pial.surf.gii']
+    >>> for mapping in vol2surf._mappings('.'):
+    ...     print(mapping.cmdline)  # doctest: +NORMALIZE_WHITESPACE
+    wb_command -volume-to-surface-mapping bold.nii.gz lh.midthickness.surf.gii
+    bold_hemi-L.func.gii -ribbon-constrained lh.white.surf.gii lh.pial.surf.gii
+    wb_command -volume-to-surface-mapping bold.nii.gz rh.midthickness.surf.gii
+    bold_hemi-R.func.gii -ribbon-constrained rh.white.surf.gii rh.pial.surf.gii
+    """
+
+    input_spec = VolumeToSurfaceMappingLRInputSpec
+    output_spec = VolumeToSurfaceMappingLROutputSpec
+
+    def _mappings(self, cwd):
+        surfaces = (
+            self.inputs.surface_files,
+            self.inputs.inner_surfaces,
+            self.inputs.outer_surfaces,
+        )
+        if {len(surface_list) for surface_list in surfaces} != {2}:
+            raise ValueError("Expected one surface of each kind per hemisphere")
+
+        nthreads = max(self.inputs.num_threads // 2, 1)
+        stem = split_filename(self.inputs.volume_file)[1]
+        mappings = []
+        for hemi, (surface_file, inner_surface, outer_surface) in zip("LR", zip(*surfaces)):
+            # Surfaces of both hemispheres may share a name, so outputs are named explicitly
+            vol2surf = VolumeToSurfaceMapping(
+                volume_file=self.inputs.volume_file,
+                surface_file=surface_file,
+                out_file=os.path.join(cwd, f"{stem}_hemi-{hemi}.func.gii"),
+                method="ribbon-constrained",
+                inner_surface=inner_surface,
+                outer_surface=outer_surface,
+                num_threads=nthreads,
+            )
+            if isdefined(self.inputs.volume_roi):
+                vol2surf.inputs.volume_roi = self.inputs.volume_roi
+            mappings.append(vol2surf)
+        return mappings
+
+    def _run_interface(self, runtime):
+        mappings = self._mappings(runtime.cwd)
+
+        def _map(vol2surf):
+            return vol2surf.run(cwd=runtime.cwd).outputs.out_file
+
+        if self.inputs.num_threads < 2:
+            self._results["out_files"] = [_map(vol2surf) for vol2surf in mappings]
+        else:
+            with ThreadPoolExecutor(max_workers=len(mappings)) as executor:
+                self._results["out_files"] = list(executor.map(_map, mappings))
+
+        return runtime
+
+
 class MetricMaskInputSpec(CommandLineInputSpec):
     """MASK A METRIC FILE
     wb_command -metric-mask
@@ -806,3 +911,154 @@ class MetricRemoveIslands(WBCommand):
     input_spec = MetricRemoveIslandsInputSpec
     output_spec = MetricRemoveIslandsOutputSpec
     _cmd = "wb_command -metric-remove-islands"
+
+
+class MetricDilateMaskResampleInputSpec(OpenMPTraitedSpec):
+    in_files = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="The metrics sampled on the native surface, one per hemisphere",
+    )
+    surf_files = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="The native surfaces to dilate on, also used for vertex areas",
+    )
+    distance = traits.Float(10.0, usedefault=True, desc="Distance in mm to dilate")
+    nearest = traits.Bool(
+        True,
+        usedefault=True,
+        desc="Use the nearest good value instead of a weighted average",
+    )
+    cortex_masks = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="ROIs of the native meshes excluding non-data vertices",
+    )
+    current_spheres = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="Sphere surfaces with the meshes that the metrics are currently on",
+    )
+    new_spheres = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="Sphere surfaces in register with current_spheres and the desired output meshes",
+    )
+    new_areas = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="Relevant anatomical surfaces with the new_spheres meshes",
+    )
+    template_rois = InputMultiObject(
+        File(exists=True),
+        mandatory=True,
+        desc="ROIs of the output meshes to mask the resampled metrics with",
+    )
+
+
+class MetricDilateMaskResampleOutputSpec(TraitedSpec):
+    out_files = OutputMultiObject(
+        File(exists=True), desc="the resampled and masked metrics, in input order"
+    )
+
+
+class MetricDilateMaskResample(WBCommand, OpenMPCommandMixin):
+    """Dilate, mask and resample metrics, then mask them on the new meshes.
+
+    Chains ``-metric-dilate``, ``-metric-mask``, ``-metric-resample`` (``ADAP_BARY_AREA``
+    with ``-area-surfs``) and ``-metric-mask``, as in the HCP
+    ``RibbonVolumeToSurfaceMapping.sh`` script, in a single process invocation.
+    Each list input holds one entry per hemisphere, and all hemispheres are processed
+    by the same invocation.
+    Intermediate metrics are removed once the outputs are written.
+
+    Examples
+
+    >>> from fmriprep.interfaces.workbench import MetricDilateMaskResample
+    >>> resample = MetricDilateMaskResample()
+    >>> resample.inputs.in_files = ['lh.bold.func.gii', 'rh.bold.func.gii']
+    >>> resample.inputs.surf_files = ['lh.midthickness.surf.gii', 'rh.midthickness.surf.gii']
+    >>> resample.inputs.cortex_masks = ['lh.roi.shape.gii', 'rh.roi.shape.gii']
+    >>> resample.inputs.current_spheres = ['lh.sphere.reg.surf.gii', 'rh.sphere.reg.surf.gii']
+    >>> resample.inputs.new_spheres = [
+    ...     'L.sphere.32k_fs_LR.surf.gii', 'R.sphere.32k_fs_LR.surf.gii']
+    >>> resample.inputs.new_areas = [
+    ...     'L.midthickness.32k_fs_LR.surf.gii', 'R.midthickness.32k_fs_LR.surf.gii']
+    >>> resample.inputs.template_rois = [
+    ...     'L.atlasroi.32k_fs_LR.shape.gii', 'R.atlasroi.32k_fs_LR.shape.gii']
+    >>> resample.cmdline  # doctest: +NORMALIZE_WHITESPACE +ELLIPSIS
+    'wb_command -metric-dilate lh.bold.func.gii lh.midthickness.surf.gii 10.0 \
+    .../lh_dil.func.gii -nearest && \
+    wb_command -metric-mask .../lh_dil.func.gii lh.roi.shape.gii .../lh_dilmasked.func.gii && \
+    wb_command -metric-resample .../lh_dilmasked.func.gii lh.sphere.reg.surf.gii \
+    L.sphere.32k_fs_LR.surf.gii ADAP_BARY_AREA .../lh_resampled.func.gii \
+    -area-surfs lh.midthickness.surf.gii L.midthickness.32k_fs_LR.surf.gii \
+    -current-roi lh.roi.shape.gii && \
+    wb_command -metric-mask .../lh_resampled.func.gii L.atlasroi.32k_fs_LR.shape.gii \
+    .../lh_fsLR.func.gii && \
+    rm -f .../lh_dil.func.gii .../lh_dilmasked.func.gii .../lh_resampled.func.gii && \
+    wb_command -metric-dilate rh.bold.func.gii rh.midthickness.surf.gii 10.0 \
+    .../rh_dil.func.gii -nearest && \
+    wb_command -metric-mask .../rh_dil.func.gii rh.roi.shape.gii .../rh_dilmasked.func.gii && \
+    wb_command -metric-resample .../rh_dilmasked.func.gii rh.sphere.reg.surf.gii \
+    R.sphere.32k_fs_LR.surf.gii ADAP_BARY_AREA .../rh_resampled.func.gii \
+    -area-surfs rh.midthickness.surf.gii R.midthickness.32k_fs_LR.surf.gii \
+    -current-roi rh.roi.shape.gii && \
+    wb_command -metric-mask .../rh_resampled.func.gii R.atlasroi.32k_fs_LR.shape.gii \
+    .../rh_fsLR.func.gii && \
+    rm -f .../rh_dil.func.gii .../rh_dilmasked.func.gii .../rh_resampled.func.gii'
+    """
+
+    input_spec = MetricDilateMaskResampleInputSpec
+    output_spec = MetricDilateMaskResampleOutputSpec
+    _cmd = "wb_command"
+
+    _list_fields = (
+        "in_files",
+        "surf_files",
+        "cortex_masks",
+        "current_spheres",
+        "new_spheres",
+        "new_areas",
+        "template_rois",
+    )
+
+    def _gen_outfiles(self, in_file):
+        stem = os.path.basename(in_file).split(".")[0]
+        return {
+            step: os.path.abspath(f"{stem}_{step}.func.gii")
+            for step in ("dil", "dilmasked", "resampled", "fsLR")
+        }
+
+    def _hemi_inputs(self):
+        lists = [getattr(self.inputs, field) for field in self._list_fields]
+        if len({len(values) for values in lists}) != 1:
+            raise ValueError(
+                f"Inputs {', '.join(self._list_fields)} must all have the same length."
+            )
+        return zip(*lists)
+
+    @property
+    def cmdline(self):
+        self._check_mandatory_inputs()
+        nearest = " -nearest" if self.inputs.nearest else ""
+        distance = self.inputs.distance
+        steps = []
+        for in_file, surf, roi, cur_sphere, new_sphere, new_area, tpl_roi in self._hemi_inputs():
+            out = self._gen_outfiles(in_file)
+            steps += [
+                f"{self.cmd} -metric-dilate {in_file} {surf} {distance} {out['dil']}{nearest}",
+                f"{self.cmd} -metric-mask {out['dil']} {roi} {out['dilmasked']}",
+                f"{self.cmd} -metric-resample {out['dilmasked']} {cur_sphere} {new_sphere} "
+                f"ADAP_BARY_AREA {out['resampled']} -area-surfs {surf} {new_area} "
+                f"-current-roi {roi}",
+                f"{self.cmd} -metric-mask {out['resampled']} {tpl_roi} {out['fsLR']}",
+                f"rm -f {out['dil']} {out['dilmasked']} {out['resampled']}",
+            ]
+        return " && ".join(steps)
+
+    def _list_outputs(self):
+        return {
+            "out_files": [self._gen_outfiles(in_file)["fsLR"] for in_file in self.inputs.in_files]
+        }
@@ -360,6 +360,7 @@ configured with cubic B-spline interpolation.
             echo_output=echos_out,
             multiecho=multiecho,
             all_metadata=all_metadata,
+            compress_nthreads=omp_nthreads,
         )
         ds_bold_native_wf.inputs.inputnode.source_files = bold_series
 
@@ -420,6 +421,7 @@ configured with cubic B-spline interpolation.
             output_dir=fmriprep_dir,
             multiecho=multiecho,
             metadata=all_metadata[0],
+            compress_nthreads=omp_nthreads,
             name='ds_bold_t1_wf',
         )
         ds_bold_t1_wf.inputs.inputnode.source_files = bold_series
@@ -453,6 +455,7 @@ configured with cubic B-spline interpolation.
             output_dir=fmriprep_dir,
             multiecho=multiecho,
             metadata=all_metadata[0],
+            compress_nthreads=omp_nthreads,
             name='ds_bold_std_wf',
         )
         ds_bold_std_wf.inputs.inputnode.source_files = bold_series
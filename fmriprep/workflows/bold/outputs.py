@@ -28,13 +28,13 @@ import typing as ty
 import numpy as np
 from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
-from niworkflows.interfaces.fixes import FixHeaderApplyTransforms as ApplyTransforms
-from niworkflows.utils.images import dseg_label
 from smriprep.workflows.outputs import _bids_relative
 
 from fmriprep import config
 from fmriprep.config import DEFAULT_MEMORY_MIN_GB
-from fmriprep.interfaces import DerivativesDataSink
+from fmriprep.interfaces import DerivativesDataSink, MultiDerivativesDataSink
+from fmriprep.interfaces.maths import SetDataType
+from fmriprep.interfaces.resampling import ResampleVolumes
 
 
 def prepare_timing_parameters(metadata: dict):
@@ -119,22 +119,22 @@ def prepare_timing_parameters(metadata: dict):
     timing_parameters["SliceTimingCorrected"] = bool(run_stc)
 
     if len(slice_timing) > 1:
-        st = sorted(slice_timing)
+        st = np.sort(np.asarray(slice_timing, dtype=np.float64))
         TA = st[-1] + (st[1] - st[0])  # Final slice onset + slice duration
         # For constant TR paradigms, use DelayTime
         if "RepetitionTime" in timing_parameters:
             TR = timing_parameters["RepetitionTime"]
             if not np.isclose(TR, TA) and TA < TR:
-                timing_parameters["DelayTime"] = TR - TA
+                timing_parameters["DelayTime"] = float(TR - TA)
         # For variable TR paradigms, use AcquisitionDuration
         elif "VolumeTiming" in timing_parameters:
-            timing_parameters["AcquisitionDuration"] = TA
+            timing_parameters["AcquisitionDuration"] = float(TA)
 
         if run_stc:
             first, last = st[0], st[-1]
             frac = config.workflow.slice_time_ref
             tzero = np.round(first + frac * (last - first), 3)
-            timing_parameters["StartTime"] = tzero
+            timing_parameters["StartTime"] = float(tzero)
 
     return timing_parameters
 
@@ -238,34 +238,18 @@ def init_func_fit_reports_wf(
 
     # Resample anatomical references into BOLD space for plotting
     t1w_boldref = pe.Node(
-        ApplyTransforms(
-            dimension=3,
-            default_value=0,
-            float=True,
-            invert_transform_flags=[True],
-            interpolation="LanczosWindowedSinc",
-        ),
+        ResampleVolumes(inverse=[True], order=3),
         name="t1w_boldref",
         mem_gb=1,
     )
 
-    t1w_wm = pe.Node(
-        niu.Function(function=dseg_label),
-        name="t1w_wm",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-    t1w_wm.inputs.label = 2  # BIDS default is WM=2
-
+    # Sample the segmentation in BOLD space and extract WM in one step
     boldref_wm = pe.Node(
-        ApplyTransforms(
-            dimension=3,
-            default_value=0,
-            invert_transform_flags=[True],
-            interpolation="NearestNeighbor",
-        ),
+        niu.Function(function=_resample_label_mask),
         name="boldref_wm",
         mem_gb=1,
     )
+    boldref_wm.inputs.label = 2  # BIDS default is WM=2
 
     # fmt:off
     workflow.connect([
@@ -278,16 +262,15 @@ def init_func_fit_reports_wf(
             ('validation_report', 'in_file'),
         ]),
         (inputnode, t1w_boldref, [
-            ('t1w_preproc', 'input_image'),
-            ('coreg_boldref', 'reference_image'),
+            ('t1w_preproc', 'in_files'),
+            ('coreg_boldref', 'ref_file'),
             ('boldref2anat_xfm', 'transforms'),
         ]),
-        (inputnode, t1w_wm, [('t1w_dseg', 'in_seg')]),
         (inputnode, boldref_wm, [
-            ('coreg_boldref', 'reference_image'),
-            ('boldref2anat_xfm', 'transforms'),
+            ('t1w_dseg', 'in_seg'),
+            ('coreg_boldref', 'ref_file'),
+            ('boldref2anat_xfm', 'transform'),
         ]),
-        (t1w_wm, boldref_wm, [('out', 'input_image')]),
     ])
     # fmt:on
 
@@ -305,13 +288,7 @@ def init_func_fit_reports_wf(
 
     if sdc_correction:
         fmapref_boldref = pe.Node(
-            ApplyTransforms(
-                dimension=3,
-                default_value=0,
-                float=True,
-                invert_transform_flags=[True],
-                interpolation="LanczosWindowedSinc",
-            ),
+            ResampleVolumes(inverse=[True], order=3),
             name="fmapref_boldref",
             mem_gb=1,
         )
@@ -363,8 +340,8 @@ def init_func_fit_reports_wf(
         # fmt:off
         workflow.connect([
             (inputnode, fmapref_boldref, [
-                ('fmap_ref', 'input_image'),
-                ('coreg_boldref', 'reference_image'),
+                ('fmap_ref', 'in_files'),
+                ('coreg_boldref', 'ref_file'),
                 ('boldref2fmap_xfm', 'transforms'),
             ]),
             (inputnode, sdcreg_report, [
@@ -372,14 +349,14 @@ def init_func_fit_reports_wf(
                 ('fieldmap', 'fieldmap'),
                 ('bold_mask', 'mask'),
             ]),
-            (fmapref_boldref, sdcreg_report, [('output_image', 'moving')]),
+            (fmapref_boldref, sdcreg_report, [('out_files', 'moving')]),
             (inputnode, ds_sdcreg_report, [('source_file', 'source_file')]),
             (sdcreg_report, ds_sdcreg_report, [('out_report', 'in_file')]),
             (inputnode, sdc_report, [
                 ('sdc_boldref', 'before'),
                 ('coreg_boldref', 'after'),
             ]),
-            (boldref_wm, sdc_report, [('output_image', 'wm_seg')]),
+            (boldref_wm, sdc_report, [('out', 'wm_seg')]),
             (inputnode, ds_sdc_report, [('source_file', 'source_file')]),
             (sdc_report, ds_sdc_report, [('out_report', 'in_file')]),
         ])
@@ -412,8 +389,8 @@ def init_func_fit_reports_wf(
     # fmt:off
     workflow.connect([
         (inputnode, epi_t1_report, [('coreg_boldref', 'after')]),
-        (t1w_boldref, epi_t1_report, [('output_image', 'before')]),
-        (boldref_wm, epi_t1_report, [('output_image', 'wm_seg')]),
+        (t1w_boldref, epi_t1_report, [('out_files', 'before')]),
+        (boldref_wm, epi_t1_report, [('out', 'wm_seg')]),
         (inputnode, ds_epi_t1_report, [('source_file', 'source_file')]),
         (epi_t1_report, ds_epi_t1_report, [('out_report', 'in_file')]),
     ])
@@ -437,7 +414,11 @@ def init_ds_boldref_wf(
     )
     outputnode = pe.Node(niu.IdentityInterface(fields=["boldref"]), name="outputnode")
 
-    raw_sources = pe.Node(niu.Function(function=_bids_relative), name="raw_sources")
+    raw_sources = pe.Node(
+        niu.Function(function=_bids_relative),
+        name="raw_sources",
+        run_without_submitting=True,
+    )
     raw_sources.inputs.bids_root = bids_root
 
     ds_boldref = pe.Node(
@@ -481,7 +462,11 @@ def init_ds_registration_wf(
     )
     outputnode = pe.Node(niu.IdentityInterface(fields=["xform"]), name="outputnode")
 
-    raw_sources = pe.Node(niu.Function(function=_bids_relative), name="raw_sources")
+    raw_sources = pe.Node(
+        niu.Function(function=_bids_relative),
+        name="raw_sources",
+        run_without_submitting=True,
+    )
     raw_sources.inputs.bids_root = bids_root
 
     ds_xform = pe.Node(
@@ -525,7 +510,11 @@ def init_ds_hmc_wf(
     )
     outputnode = pe.Node(niu.IdentityInterface(fields=["xforms"]), name="outputnode")
 
-    raw_sources = pe.Node(niu.Function(function=_bids_relative), name="raw_sources")
+    raw_sources = pe.Node(
+        niu.Function(function=_bids_relative),
+        name="raw_sources",
+        run_without_submitting=True,
+    )
     raw_sources.inputs.bids_root = bids_root
 
     ds_xforms = pe.Node(
@@ -563,6 +552,7 @@ def init_ds_bold_native_wf(
     bold_output: bool,
     echo_output: bool,
     all_metadata: ty.List[dict],
+    compress_nthreads: int = 1,
     name="ds_bold_native_wf",
 ) -> pe.Workflow:
     metadata = all_metadata[0]
@@ -582,7 +572,11 @@ def init_ds_bold_native_wf(
         name='inputnode',
     )
 
-    raw_sources = pe.Node(niu.Function(function=_bids_relative), name='raw_sources')
+    raw_sources = pe.Node(
+        niu.Function(function=_bids_relative),
+        name='raw_sources',
+        run_without_submitting=True,
+    )
     raw_sources.inputs.bids_root = bids_root
     workflow.connect(inputnode, 'source_files', raw_sources, 'in_files')
 
@@ -613,6 +607,7 @@ def init_ds_bold_native_wf(
                 base_directory=output_dir,
                 desc='preproc',
                 compress=True,
+                num_threads=compress_nthreads,
                 SkullStripped=multiecho,
                 TaskName=metadata.get('TaskName'),
                 dismiss_entities=("echo",),
@@ -647,27 +642,34 @@ def init_ds_bold_native_wf(
             run_without_submitting=True,
             mem_gb=DEFAULT_MEMORY_MIN_GB,
         )
+        # T2* maps span a narrow range, so a scaled int16 loses no useful precision
+        t2star_int16 = pe.Node(
+            SetDataType(dtype='int16'),
+            name='t2star_int16',
+            mem_gb=DEFAULT_MEMORY_MIN_GB,
+        )
         workflow.connect([
-            (inputnode, ds_t2star, [
-                ('source_files', 'source_file'),
-                ('t2star', 'in_file'),
-            ]),
+            (inputnode, t2star_int16, [('t2star', 'in_file')]),
+            (inputnode, ds_t2star, [('source_files', 'source_file')]),
+            (t2star_int16, ds_t2star, [('out_file', 'in_file')]),
             (raw_sources, ds_t2star, [('out', 'RawSources')]),
         ])  # fmt:skip
 
     if echo_output:
-        ds_bold_echos = pe.MapNode(
-            DerivativesDataSink(
+        # All echoes are stored by a single node, rather than one MapNode iteration each.
+        # Echoes are written one at a time, but the node is submitted like ds_bold,
+        # as it may compress with multiple threads
+        ds_bold_echos = pe.Node(
+            MultiDerivativesDataSink(
                 base_directory=output_dir,
                 desc='preproc',
                 compress=True,
+                num_threads=compress_nthreads,
                 SkullStripped=False,
                 TaskName=metadata.get('TaskName'),
                 **timing_parameters,
             ),
-            iterfield=['source_file', 'in_file', 'meta_dict'],
             name='ds_bold_echos',
-            run_without_submitting=True,
             mem_gb=DEFAULT_MEMORY_MIN_GB,
         )
         ds_bold_echos.inputs.meta_dict = [{"EchoTime": md["EchoTime"]} for md in all_metadata]
@@ -687,6 +689,7 @@ def init_ds_volumes_wf(
     output_dir: str,
     multiecho: bool,
     metadata: ty.List[dict],
+    compress_nthreads: int = 1,
     name="ds_volumes_wf",
 ) -> pe.Workflow:
     timing_parameters = prepare_timing_parameters(metadata)
@@ -714,7 +717,11 @@ def init_ds_volumes_wf(
         name='inputnode',
     )
 
-    raw_sources = pe.Node(niu.Function(function=_bids_relative), name='raw_sources')
+    raw_sources = pe.Node(
+        niu.Function(function=_bids_relative),
+        name='raw_sources',
+        run_without_submitting=True,
+    )
     raw_sources.inputs.bids_root = bids_root
     boldref2target = pe.Node(niu.Merge(2), name='boldref2target')
 
@@ -724,6 +731,7 @@ def init_ds_volumes_wf(
             base_directory=output_dir,
             desc='preproc',
             compress=True,
+            num_threads=compress_nthreads,
             SkullStripped=multiecho,
             TaskName=metadata.get('TaskName'),
             dismiss_entities=("echo",),
@@ -747,23 +755,6 @@ def init_ds_volumes_wf(
         ]),
     ])  # fmt:skip
 
-    resample_ref = pe.Node(
-        ApplyTransforms(
-            dimension=3,
-            default_value=0,
-            float=True,
-            interpolation="LanczosWindowedSinc",
-        ),
-        name="resample_ref",
-    )
-    resample_mask = pe.Node(ApplyTransforms(interpolation="MultiLabel"), name="resample_mask")
-    resamplers = [resample_ref, resample_mask]
-
-    workflow.connect([
-        (inputnode, resample_ref, [('bold_ref', 'input_image')]),
-        (inputnode, resample_mask, [('bold_mask', 'input_image')]),
-    ])  # fmt:skip
-
     ds_ref = pe.Node(
         DerivativesDataSink(
             base_directory=output_dir,
@@ -788,6 +779,11 @@ def init_ds_volumes_wf(
         mem_gb=DEFAULT_MEMORY_MIN_GB,
     )
     datasinks = [ds_ref, ds_mask]
+    # Nodes receiving the resampled images, in the order of image_fields
+    image_sinks = [ds_ref, ds_mask]
+    # Cubic interpolation for the reference, nearest-neighbor for the mask
+    image_fields = ['bold_ref', 'bold_mask']
+    orders = [3, 0]
 
     if multiecho:
         t2star_meta = {
@@ -795,15 +791,6 @@ def init_ds_volumes_wf(
             'EstimationReference': 'doi:10.1002/mrm.20900',
             'EstimationAlgorithm': 'monoexponential decay model',
         }
-        resample_t2star = pe.Node(
-            ApplyTransforms(
-                dimension=3,
-                default_value=0,
-                float=True,
-                interpolation="LanczosWindowedSinc",
-            ),
-            name="resample_t2star",
-        )
         ds_t2star = pe.Node(
             DerivativesDataSink(
                 base_directory=output_dir,
@@ -816,18 +803,47 @@ def init_ds_volumes_wf(
             run_without_submitting=True,
             mem_gb=DEFAULT_MEMORY_MIN_GB,
         )
-        resamplers.append(resample_t2star)
+        # T2* maps span a narrow range, so a scaled int16 loses no useful precision
+        t2star_int16 = pe.Node(
+            SetDataType(dtype='int16'),
+            name='t2star_int16',
+            mem_gb=DEFAULT_MEMORY_MIN_GB,
+        )
+        workflow.connect([(t2star_int16, ds_t2star, [('out_file', 'in_file')])])
         datasinks.append(ds_t2star)
-
-        workflow.connect([(inputnode, resample_t2star, [('t2star', 'input_image')])])
+        image_sinks.append(t2star_int16)
+        image_fields.append('t2star')
+        orders.append(3)
+
+    # All boldref-space images share the same transforms, so the target grid
+    # is mapped into boldref space once and reused for every image
+    merge_images = pe.Node(
+        niu.Merge(len(image_fields)),
+        name='merge_images',
+        run_without_submitting=True,
+    )
+    # Images are resampled one per thread, so extra threads would sit idle
+    resample_nthreads = min(config.nipype.omp_nthreads, len(image_fields))
+    resample = pe.Node(
+        ResampleVolumes(order=orders, num_threads=resample_nthreads),
+        name='resample',
+        n_procs=resample_nthreads,
+    )
+    split_images = pe.Node(
+        niu.Split(splits=[1] * len(image_fields), squeeze=True),
+        name='split_images',
+        run_without_submitting=True,
+    )
 
     workflow.connect(
         [
-            (inputnode, resampler, [('ref_file', 'reference_image')])
-            for resampler in resamplers
-        ] + [
-            (boldref2target, resampler, [('out', 'transforms')])
-            for resampler in resamplers
+            (inputnode, merge_images, [
+                (field, f'in{idx}') for idx, field in enumerate(image_fields, start=1)
+            ]),
+            (inputnode, resample, [('ref_file', 'ref_file')]),
+            (boldref2target, resample, [('out', 'transforms')]),
+            (merge_images, resample, [('out', 'in_files')]),
+            (resample, split_images, [('out_files', 'inlist')]),
         ] + [
             (inputnode, datasink, [
                 ('source_files', 'source_file'),
@@ -837,8 +853,8 @@ def init_ds_volumes_wf(
             ])
             for datasink in datasinks
         ] + [
-            (resampler, datasink, [("output_image", "in_file")])
-            for resampler, datasink in zip(resamplers, datasinks)
+            (split_images, image_sink, [(f'out{idx}', 'in_file')])
+            for idx, image_sink in enumerate(image_sinks, start=1)
         ]
     )  # fmt:skip
 
@@ -923,3 +939,38 @@ def init_bold_preproc_report_wf(
     # fmt:on
 
     return workflow
+
+
+def _resample_label_mask(in_seg, ref_file, transform, label):
+    """Resample the mask of one label in a segmentation into a reference space.
+
+    The segmentation is sampled with nearest-neighbor interpolation and the label
+    is extracted in memory, without writing an intermediate mask to disk.
+    ``transform`` maps the reference onto the segmentation, and is inverted.
+    """
+    from pathlib import Path
+
+    import nibabel as nb
+    import numpy as np
+
+    from fmriprep.interfaces.resampling import resample_volumes
+    from fmriprep.utils.transforms import load_transforms
+
+    target = nb.load(ref_file)
+    labels = resample_volumes(
+        sources=[nb.load(in_seg)],
+        target=target,
+        transforms=load_transforms([transform], [True]),
+        orders=[0],
+    )[0]
+
+    mask = nb.Nifti1Image(
+        (np.asanyarray(labels.dataobj) == label).astype(np.uint8),
+        target.affine,
+        target.header,
+    )
+    mask.set_data_dtype(np.uint8)
+
+    out_file = Path(f"label-{label}_mask.nii.gz").absolute()
+    mask.to_filename(out_file)
+    return str(out_file)
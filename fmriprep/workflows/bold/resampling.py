@@ -34,16 +34,14 @@ from __future__ import annotations
 
 import typing as ty
 
-from nipype import Function
 from nipype.interfaces import freesurfer as fs
-from nipype.interfaces import fsl
 from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
-from niworkflows.interfaces.fixes import FixHeaderApplyTransforms as ApplyTransforms
 from niworkflows.interfaces.freesurfer import MedialNaNs
 
 from ...config import DEFAULT_MEMORY_MIN_GB
-from ...interfaces.workbench import MetricDilate, MetricMask, MetricResample
+from ...interfaces.goodvoxels import GoodVoxelsMask, MeanStdCoV
+from ...interfaces.maths import SetDataType
 from .outputs import prepare_timing_parameters
 
 
@@ -79,6 +77,12 @@ def init_bold_surf_wf(
 
     Parameters
     ----------
+    mem_gb : :obj:`float`
+        Memory estimate for resampling the BOLD series, in GB, as calculated by
+        :func:`~fmriprep.utils.misc.estimate_bold_mem_usage` (``"resampled"``, four times
+        the size of the series in double precision, or eight times in single precision).
+        Each sampler holds one single-precision copy of the series, so 1.5x this estimate
+        leaves ample room for surfaces and intermediate buffers.
     surface_spaces : :obj:`list`
         List of FreeSurfer surface-spaces (either ``fsaverage{3,4,5,6,}`` or ``fsnative``)
         the functional images are to be resampled to.
@@ -141,95 +145,105 @@ The BOLD time-series were resampled onto the following surfaces
 
     get_fsnative = pe.Node(FreeSurferSource(), name="get_fsnative", run_without_submitting=True)
 
-    def select_target(subject_id, space):
-        """Get the target subject ID, given a source subject ID and a target space."""
-        return subject_id if space == "fsnative" else space
+    # Template spaces are their own target subjects; only fsnative must be looked up
+    targets, target_field = itersource, "target"
+    if "fsnative" in surface_spaces:
 
-    targets = pe.Node(
-        niu.Function(function=select_target),
-        name="targets",
-        run_without_submitting=True,
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
+        def select_target(subject_id, space):
+            """Get the target subject ID, given a source subject ID and a target space."""
+            return subject_id if space == "fsnative" else space
+
+        targets = pe.Node(
+            niu.Function(function=select_target),
+            name="targets",
+            run_without_submitting=True,
+            mem_gb=DEFAULT_MEMORY_MIN_GB,
+        )
+        target_field = "out"
+        workflow.connect([
+            (inputnode, targets, [("subject_id", "subject_id")]),
+            (itersource, targets, [("target", "space")]),
+        ])  # fmt:skip
 
     itk2lta = pe.Node(
         ConcatenateXFMs(out_fmt="fs", inverse=True), name="itk2lta", run_without_submitting=True
     )
-    sampler = pe.MapNode(
-        fs.SampleToSurface(
-            interp_method="trilinear",
-            out_type="gii",
-            override_reg_subj=True,
-            sampling_method="average",
-            sampling_range=(0, 1, 0.2),
-            sampling_units="frac",
-        ),
-        iterfield=["hemi"],
-        name="sampler",
-        mem_gb=mem_gb * 3,
-    )
-    sampler.inputs.hemi = ["lh", "rh"]
-
-    update_metadata = pe.MapNode(
-        GiftiSetAnatomicalStructure(),
-        iterfield=["in_file"],
-        name="update_metadata",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    ds_bold_surfs = pe.MapNode(
-        DerivativesDataSink(
-            base_directory=output_dir,
-            extension=".func.gii",
-            TaskName=metadata.get('TaskName'),
-            **timing_parameters,
-        ),
-        iterfield=['in_file', 'hemi'],
-        name='ds_bold_surfs',
-        run_without_submitting=True,
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-    ds_bold_surfs.inputs.hemi = ["L", "R"]
 
     workflow.connect([
         (inputnode, get_fsnative, [
             ("subject_id", "subject_id"),
             ("subjects_dir", "subjects_dir")
         ]),
-        (inputnode, targets, [("subject_id", "subject_id")]),
         (inputnode, itk2lta, [
             ("bold_t1w", "moving"),
             ("fsnative2t1w_xfm", "in_xfms"),
         ]),
         (get_fsnative, itk2lta, [("T1", "reference")]),
-        (inputnode, sampler, [
-            ("subjects_dir", "subjects_dir"),
-            ("subject_id", "subject_id"),
-            ("bold_t1w", "source_file"),
-        ]),
-        (itersource, targets, [("target", "space")]),
-        (itk2lta, sampler, [("out_inv", "reg_file")]),
-        (targets, sampler, [("out", "target_subject")]),
-        (inputnode, ds_bold_surfs, [("source_file", "source_file")]),
-        (itersource, ds_bold_surfs, [("target", "space")]),
-        (update_metadata, ds_bold_surfs, [("out_file", "in_file")]),
     ])  # fmt:skip
 
-    # Refine if medial vertices should be NaNs
-    medial_nans = pe.MapNode(
-        MedialNaNs(), iterfield=["in_file"], name="medial_nans", mem_gb=DEFAULT_MEMORY_MIN_GB
-    )
+    # Hemispheres are independent, so each gets its own nodes and both can run concurrently.
+    # mri_vol2surf is kept (rather than Workbench's ribbon-constrained mapping, used for fsLR)
+    # because it samples directly onto fsaverage targets, and changing the method would
+    # change the values of existing surface derivatives.
+    for hemi in ("lh", "rh"):
+        sampler = pe.Node(
+            fs.SampleToSurface(
+                hemi=hemi,
+                interp_method="trilinear",
+                out_type="gii",
+                override_reg_subj=True,
+                sampling_method="average",
+                sampling_range=(0, 1, 0.2),
+                sampling_units="frac",
+            ),
+            name=f"sampler_{hemi}",
+            mem_gb=mem_gb * 1.5,
+        )
+
+        update_metadata = pe.Node(
+            GiftiSetAnatomicalStructure(),
+            name=f"update_metadata_{hemi}",
+            mem_gb=DEFAULT_MEMORY_MIN_GB,
+        )
+
+        ds_bold_surfs = pe.Node(
+            DerivativesDataSink(
+                base_directory=output_dir,
+                hemi=hemi[0].upper(),
+                extension=".func.gii",
+                TaskName=metadata.get('TaskName'),
+                **timing_parameters,
+            ),
+            name=f"ds_bold_surfs_{hemi}",
+            run_without_submitting=True,
+            mem_gb=DEFAULT_MEMORY_MIN_GB,
+        )
 
-    if medial_surface_nan:
-        # fmt: off
         workflow.connect([
-            (inputnode, medial_nans, [("subjects_dir", "subjects_dir")]),
-            (sampler, medial_nans, [("out_file", "in_file")]),
-            (medial_nans, update_metadata, [("out_file", "in_file")]),
-        ])
-        # fmt: on
-    else:
-        workflow.connect([(sampler, update_metadata, [("out_file", "in_file")])])
+            (inputnode, sampler, [
+                ("subjects_dir", "subjects_dir"),
+                ("subject_id", "subject_id"),
+                ("bold_t1w", "source_file"),
+            ]),
+            (itk2lta, sampler, [("out_inv", "reg_file")]),
+            (targets, sampler, [(target_field, "target_subject")]),
+            (inputnode, ds_bold_surfs, [("source_file", "source_file")]),
+            (itersource, ds_bold_surfs, [("target", "space")]),
+            (update_metadata, ds_bold_surfs, [("out_file", "in_file")]),
+        ])  # fmt:skip
+
+        # Refine if medial vertices should be NaNs
+        if medial_surface_nan:
+            medial_nans = pe.Node(
+                MedialNaNs(), name=f"medial_nans_{hemi}", mem_gb=DEFAULT_MEMORY_MIN_GB
+            )
+            workflow.connect([
+                (inputnode, medial_nans, [("subjects_dir", "subjects_dir")]),
+                (sampler, medial_nans, [("out_file", "in_file")]),
+                (medial_nans, update_metadata, [("out_file", "in_file")]),
+            ])  # fmt:skip
+        else:
+            workflow.connect([(sampler, update_metadata, [("out_file", "in_file")])])
 
     return workflow
 
@@ -261,10 +275,18 @@ def init_goodvoxels_bold_mask_wf(mem_gb: float, name: str = "goodvoxels_bold_mas
 
     Outputs
     -------
-    masked_bold
-        BOLD series after masking outlier voxels with locally high COV
+    goodvoxels_mask
+        Mask of the BOLD series excluding outlier voxels with locally high COV
     goodvoxels_ribbon
         Cortical ribbon mask excluding voxels with locally high COV
+    bold_mean
+        Temporal mean of the BOLD series
+    bold_std
+        Temporal standard deviation of the BOLD series
+    bold_cov
+        Temporal coefficient of variation of the BOLD series
+    upper_thresh
+        Modulated COV above which voxels were excluded
     """
     workflow = pe.Workflow(name=name)
 
@@ -282,219 +304,49 @@ def init_goodvoxels_bold_mask_wf(mem_gb: float, name: str = "goodvoxels_bold_mas
             fields=[
                 "goodvoxels_mask",
                 "goodvoxels_ribbon",
+                "bold_mean",
+                "bold_std",
+                "bold_cov",
+                "upper_thresh",
             ]
         ),
         name="outputnode",
     )
-    ribbon_boldsrc_xfm = pe.Node(
-        ApplyTransforms(interpolation='MultiLabel', transforms='identity'),
-        name="ribbon_boldsrc_xfm",
-        mem_gb=mem_gb,
-    )
-
-    stdev_volume = pe.Node(
-        fsl.maths.StdImage(dimension='T'),
-        name="stdev_volume",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    mean_volume = pe.Node(
-        fsl.maths.MeanImage(dimension='T'),
-        name="mean_volume",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_volume = pe.Node(
-        fsl.maths.BinaryMaths(operation='div'),
-        name="cov_volume",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_ribbon = pe.Node(
-        fsl.ApplyMask(),
-        name="cov_ribbon",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_ribbon_mean = pe.Node(
-        fsl.ImageStats(op_string='-M'),
-        name="cov_ribbon_mean",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_ribbon_std = pe.Node(
-        fsl.ImageStats(op_string='-S'),
-        name="cov_ribbon_std",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_ribbon_norm = pe.Node(
-        fsl.maths.BinaryMaths(operation='div'),
-        name="cov_ribbon_norm",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    smooth_norm = pe.Node(
-        fsl.maths.MathsCommand(args="-bin -s 5"),
-        name="smooth_norm",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    merge_smooth_norm = pe.Node(
-        niu.Merge(1),
-        name="merge_smooth_norm",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-        run_without_submitting=True,
-    )
-
-    cov_ribbon_norm_smooth = pe.Node(
-        fsl.maths.MultiImageMaths(op_string='-s 5 -div %s -dilD'),
-        name="cov_ribbon_norm_smooth",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_norm = pe.Node(
-        fsl.maths.BinaryMaths(operation='div'),
-        name="cov_norm",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_norm_modulate = pe.Node(
-        fsl.maths.BinaryMaths(operation='div'),
-        name="cov_norm_modulate",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    cov_norm_modulate_ribbon = pe.Node(
-        fsl.ApplyMask(),
-        name="cov_norm_modulate_ribbon",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    def _calc_upper_thr(in_stats):
-        return in_stats[0] + (in_stats[1] * 0.5)
-
-    upper_thr_val = pe.Node(
-        Function(
-            input_names=["in_stats"], output_names=["upper_thresh"], function=_calc_upper_thr
-        ),
-        name="upper_thr_val",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    def _calc_lower_thr(in_stats):
-        return in_stats[1] - (in_stats[0] * 0.5)
-
-    lower_thr_val = pe.Node(
-        Function(
-            input_names=["in_stats"], output_names=["lower_thresh"], function=_calc_lower_thr
-        ),
-        name="lower_thr_val",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    mod_ribbon_mean = pe.Node(
-        fsl.ImageStats(op_string='-M'),
-        name="mod_ribbon_mean",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    mod_ribbon_std = pe.Node(
-        fsl.ImageStats(op_string='-S'),
-        name="mod_ribbon_std",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    merge_mod_ribbon_stats = pe.Node(
-        niu.Merge(2),
-        name="merge_mod_ribbon_stats",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-        run_without_submitting=True,
-    )
-
-    bin_mean_volume = pe.Node(
-        fsl.maths.UnaryMaths(operation="bin"),
-        name="bin_mean_volume",
-        mem_gb=DEFAULT_MEMORY_MIN_GB,
-    )
-
-    merge_goodvoxels_operands = pe.Node(
-        niu.Merge(2),
-        name="merge_goodvoxels_operands",
+    # Mean, standard deviation and COV, from a single read of the BOLD series
+    bold_stats = pe.Node(
+        MeanStdCoV(),
+        name="bold_stats",
         mem_gb=DEFAULT_MEMORY_MIN_GB,
-        run_without_submitting=True,
-    )
-
-    goodvoxels_thr = pe.Node(
-        fsl.maths.Threshold(),
-        name="goodvoxels_thr",
-        mem_gb=mem_gb,
-    )
-
-    goodvoxels_mask = pe.Node(
-        fsl.maths.MultiImageMaths(op_string='-bin -sub %s -mul -1'),
-        name="goodvoxels_mask",
-        mem_gb=mem_gb,
     )
 
     # make HCP-style "goodvoxels" mask in t1w space for filtering outlier voxels
     # in bold timeseries, based on modulated normalized covariance
-    workflow.connect(
-        [
-            (inputnode, ribbon_boldsrc_xfm, [("anat_ribbon", "input_image")]),
-            (inputnode, stdev_volume, [("bold_file", "in_file")]),
-            (inputnode, mean_volume, [("bold_file", "in_file")]),
-            (mean_volume, ribbon_boldsrc_xfm, [("out_file", "reference_image")]),
-            (stdev_volume, cov_volume, [("out_file", "in_file")]),
-            (mean_volume, cov_volume, [("out_file", "operand_file")]),
-            (cov_volume, cov_ribbon, [("out_file", "in_file")]),
-            (ribbon_boldsrc_xfm, cov_ribbon, [("output_image", "mask_file")]),
-            (cov_ribbon, cov_ribbon_mean, [("out_file", "in_file")]),
-            (cov_ribbon, cov_ribbon_std, [("out_file", "in_file")]),
-            (cov_ribbon, cov_ribbon_norm, [("out_file", "in_file")]),
-            (cov_ribbon_mean, cov_ribbon_norm, [("out_stat", "operand_value")]),
-            (cov_ribbon_norm, smooth_norm, [("out_file", "in_file")]),
-            (smooth_norm, merge_smooth_norm, [("out_file", "in1")]),
-            (cov_ribbon_norm, cov_ribbon_norm_smooth, [("out_file", "in_file")]),
-            (merge_smooth_norm, cov_ribbon_norm_smooth, [("out", "operand_files")]),
-            (cov_ribbon_mean, cov_norm, [("out_stat", "operand_value")]),
-            (cov_volume, cov_norm, [("out_file", "in_file")]),
-            (cov_norm, cov_norm_modulate, [("out_file", "in_file")]),
-            (cov_ribbon_norm_smooth, cov_norm_modulate, [("out_file", "operand_file")]),
-            (cov_norm_modulate, cov_norm_modulate_ribbon, [("out_file", "in_file")]),
-            (ribbon_boldsrc_xfm, cov_norm_modulate_ribbon, [("output_image", "mask_file")]),
-            (cov_norm_modulate_ribbon, mod_ribbon_mean, [("out_file", "in_file")]),
-            (cov_norm_modulate_ribbon, mod_ribbon_std, [("out_file", "in_file")]),
-            (mod_ribbon_mean, merge_mod_ribbon_stats, [("out_stat", "in1")]),
-            (mod_ribbon_std, merge_mod_ribbon_stats, [("out_stat", "in2")]),
-            (merge_mod_ribbon_stats, upper_thr_val, [("out", "in_stats")]),
-            (merge_mod_ribbon_stats, lower_thr_val, [("out", "in_stats")]),
-            (mean_volume, bin_mean_volume, [("out_file", "in_file")]),
-            (upper_thr_val, goodvoxels_thr, [("upper_thresh", "thresh")]),
-            (cov_norm_modulate, goodvoxels_thr, [("out_file", "in_file")]),
-            (bin_mean_volume, merge_goodvoxels_operands, [("out_file", "in1")]),
-            (goodvoxels_thr, goodvoxels_mask, [("out_file", "in_file")]),
-            (merge_goodvoxels_operands, goodvoxels_mask, [("out", "operand_files")]),
-        ]
-    )
-
-    goodvoxels_ribbon_mask = pe.Node(
-        fsl.ApplyMask(),
-        name_source=['in_file'],
-        keep_extension=True,
-        name="goodvoxels_ribbon_mask",
+    goodvoxels_mask = pe.Node(
+        GoodVoxelsMask(),
+        name="goodvoxels_mask",
         mem_gb=DEFAULT_MEMORY_MIN_GB,
     )
 
-    # apply goodvoxels ribbon mask to bold
     workflow.connect(
         [
-            (goodvoxels_mask, goodvoxels_ribbon_mask, [("out_file", "in_file")]),
-            (ribbon_boldsrc_xfm, goodvoxels_ribbon_mask, [("output_image", "mask_file")]),
-            (goodvoxels_mask, outputnode, [("out_file", "goodvoxels_mask")]),
-            (goodvoxels_ribbon_mask, outputnode, [("out_file", "goodvoxels_ribbon")]),
+            (inputnode, bold_stats, [("bold_file", "in_file")]),
+            (inputnode, goodvoxels_mask, [("anat_ribbon", "anat_ribbon")]),
+            (bold_stats, goodvoxels_mask, [
+                ("mean_file", "mean_file"),
+                ("cov_file", "cov_file"),
+            ]),
+            (goodvoxels_mask, outputnode, [
+                ("goodvoxels_mask", "goodvoxels_mask"),
+                ("goodvoxels_ribbon", "goodvoxels_ribbon"),
+                ("upper_thresh", "upper_thresh"),
+            ]),
+            (bold_stats, outputnode, [
+                ("mean_file", "bold_mean"),
+                ("std_file", "bold_std"),
+                ("cov_file", "bold_cov"),
+            ]),
         ]
-    )
+    )  # fmt:skip
 
     return workflow
 
@@ -536,7 +388,12 @@ def init_bold_fsLR_resampling_wf(
     omp_nthreads : :class:`int`
         Maximum number of threads an individual process may use
     mem_gb : :class:`float`
-        Size of BOLD file in GB
+        Memory estimate for resampling the BOLD series, in GB, as calculated by
+        :func:`~fmriprep.utils.misc.estimate_bold_mem_usage` (``"resampled"``, four times
+        the size of the series in double precision, or eight times in single precision).
+        Volume-to-surface mapping runs one process per hemisphere, each holding one
+        single-precision copy of the series, so 1.5x this estimate leaves ample room
+        for surfaces and intermediate buffers.
     name : :class:`str`
         Name of workflow (default: ``bold_fsLR_resampling_wf``)
 
@@ -559,19 +416,27 @@ def init_bold_fsLR_resampling_wf(
         Path to BOLD series resampled as functional GIFTI files in fsLR space
     goodvoxels_mask : :class:`str`
         Path to mask of voxels, excluding those with locally high coefficients of variation
+    bold_mean : :class:`str`
+        Path to the temporal mean of the BOLD series, if goodvoxels were estimated
+    bold_std : :class:`str`
+        Path to the temporal standard deviation of the BOLD series,
+        if goodvoxels were estimated
+    bold_cov : :class:`str`
+        Path to the temporal coefficient of variation of the BOLD series,
+        if goodvoxels were estimated
 
     """
     import templateflow.api as tf
     from niworkflows.engine.workflows import LiterateWorkflow as Workflow
-    from niworkflows.interfaces.utility import KeySelect
     from smriprep import data as smriprep_data
     from smriprep.interfaces.workbench import SurfaceResample
 
     from fmriprep.interfaces.gifti import CreateROI
     from fmriprep.interfaces.workbench import (
+        MetricDilateMaskResample,
         MetricFillHoles,
         MetricRemoveIslands,
-        VolumeToSurfaceMapping,
+        VolumeToSurfaceMappingLR,
     )
 
     fslr_density = "32k" if grayord_density == "91k" else "59k"
@@ -599,42 +464,38 @@ The BOLD time-series were resampled onto the left/right-symmetric template
         name='inputnode',
     )
 
-    hemisource = pe.Node(
-        niu.IdentityInterface(fields=['hemi']),
-        name='hemisource',
-        iterables=[('hemi', ['L', 'R'])],
+    outputnode = pe.Node(
+        niu.IdentityInterface(
+            fields=['bold_fsLR', 'goodvoxels_mask', 'bold_mean', 'bold_std', 'bold_cov']
+        ),
+        name='outputnode',
     )
 
-    joinnode = pe.JoinNode(
-        niu.IdentityInterface(fields=['bold_fsLR']),
-        name='joinnode',
-        joinsource='hemisource',
+    # Workbench operates on single-precision data; store BOLD as uncompressed float32
+    # once, so that its consumers neither convert wider types nor decompress it again
+    bold_float32 = pe.Node(
+        SetDataType(dtype='float32', uncompress=True),
+        name="bold_float32",
+        mem_gb=mem_gb / 4,
     )
 
-    outputnode = pe.Node(
-        niu.IdentityInterface(fields=['bold_fsLR', 'goodvoxels_mask']),
-        name='outputnode',
+    # RibbonVolumeToSurfaceMapping.sh
+    # Line 85 thru ...
+    # Both hemispheres are sampled concurrently, to share reads of the BOLD
+    volume_to_surface = pe.Node(
+        VolumeToSurfaceMappingLR(num_threads=omp_nthreads),
+        name="volume_to_surface",
+        mem_gb=mem_gb * 1.5,
+        n_procs=omp_nthreads,
     )
-
-    # select white, midthickness and pial surfaces based on hemi
-    select_surfaces = pe.Node(
-        KeySelect(
-            fields=[
-                "white",
-                "pial",
-                "midthickness",
-                'midthickness_fsLR',
-                "sphere_reg_fsLR",
-                "template_sphere",
-                'cortex_mask',
-                "template_roi",
-            ],
-            keys=["L", "R"],
-        ),
-        name="select_surfaces",
-        run_without_submitting=True,
+    # Dilate and mask on the native surface, resample to fsLR and mask ... line 89
+    # Both hemispheres are processed by a single node, in [L, R] order
+    resample_to_fsLR = pe.Node(
+        MetricDilateMaskResample(distance=10, nearest=True, num_threads=omp_nthreads),
+        name="resample_to_fsLR",
+        n_procs=omp_nthreads,
     )
-    select_surfaces.inputs.template_sphere = [
+    resample_to_fsLR.inputs.new_spheres = [
         str(sphere)
         for sphere in tf.get(
             template='fsLR',
@@ -645,70 +506,30 @@ The BOLD time-series were resampled onto the left/right-symmetric template
         )
     ]
     atlases = smriprep_data.load_resource('atlases')
-    select_surfaces.inputs.template_roi = [
+    resample_to_fsLR.inputs.template_rois = [
         str(atlases / 'L.atlasroi.32k_fs_LR.shape.gii'),
         str(atlases / 'R.atlasroi.32k_fs_LR.shape.gii'),
     ]
 
-    # RibbonVolumeToSurfaceMapping.sh
-    # Line 85 thru ...
-    volume_to_surface = pe.Node(
-        VolumeToSurfaceMapping(method="ribbon-constrained"),
-        name="volume_to_surface",
-        mem_gb=mem_gb * 3,
-        n_procs=omp_nthreads,
-    )
-    metric_dilate = pe.Node(
-        MetricDilate(distance=10, nearest=True),
-        name="metric_dilate",
-        n_procs=omp_nthreads,
-    )
-    mask_native = pe.Node(MetricMask(), name="mask_native")
-    resample_to_fsLR = pe.Node(
-        MetricResample(method='ADAP_BARY_AREA', area_surfs=True),
-        name="resample_to_fsLR",
-        n_procs=omp_nthreads,
-    )
-    # ... line 89
-    mask_fsLR = pe.Node(MetricMask(), name="mask_fsLR")
-
     workflow.connect([
-        (inputnode, select_surfaces, [
-            ('white', 'white'),
-            ('pial', 'pial'),
-            ('midthickness', 'midthickness'),
-            ('midthickness_fsLR', 'midthickness_fsLR'),
-            ('sphere_reg_fsLR', 'sphere_reg_fsLR'),
-            ('cortex_mask', 'cortex_mask'),
-        ]),
-        (hemisource, select_surfaces, [('hemi', 'key')]),
         # Resample BOLD to native surface, dilate and mask
+        (inputnode, bold_float32, [('bold_file', 'in_file')]),
+        (bold_float32, volume_to_surface, [('out_file', 'volume_file')]),
         (inputnode, volume_to_surface, [
-            ('bold_file', 'volume_file'),
+            ('midthickness', 'surface_files'),
+            ('white', 'inner_surfaces'),
+            ('pial', 'outer_surfaces'),
         ]),
-        (select_surfaces, volume_to_surface, [
-            ('midthickness', 'surface_file'),
-            ('white', 'inner_surface'),
-            ('pial', 'outer_surface'),
+        # Dilate and mask, resample BOLD to fsLR and mask
+        (volume_to_surface, resample_to_fsLR, [('out_files', 'in_files')]),
+        (inputnode, resample_to_fsLR, [
+            ('midthickness', 'surf_files'),
+            ('cortex_mask', 'cortex_masks'),
+            ('sphere_reg_fsLR', 'current_spheres'),
+            ('midthickness_fsLR', 'new_areas'),
         ]),
-        (select_surfaces, metric_dilate, [('midthickness', 'surf_file')]),
-        (select_surfaces, mask_native, [('cortex_mask', 'mask')]),
-        (volume_to_surface, metric_dilate, [('out_file', 'in_file')]),
-        (metric_dilate, mask_native, [('out_file', 'in_file')]),
-        # Resample BOLD to fsLR and mask
-        (select_surfaces, resample_to_fsLR, [
-            ('sphere_reg_fsLR', 'current_sphere'),
-            ('template_sphere', 'new_sphere'),
-            ('midthickness', 'current_area'),
-            ('midthickness_fsLR', 'new_area'),
-            ('cortex_mask', 'roi_metric'),
-        ]),
-        (mask_native, resample_to_fsLR, [('out_file', 'in_file')]),
-        (select_surfaces, mask_fsLR, [('template_roi', 'mask')]),
-        (resample_to_fsLR, mask_fsLR, [('out_file', 'in_file')]),
         # Output
-        (mask_fsLR, joinnode, [('out_file', 'bold_fsLR')]),
-        (joinnode, outputnode, [('bold_fsLR', 'bold_fsLR')]),
+        (resample_to_fsLR, outputnode, [('out_files', 'bold_fsLR')]),
     ])  # fmt:skip
 
     if estimate_goodvoxels:
@@ -720,15 +541,16 @@ excluding voxels whose time-series have a locally high coefficient of variation.
         goodvoxels_bold_mask_wf = init_goodvoxels_bold_mask_wf(mem_gb)
 
         workflow.connect([
-            (inputnode, goodvoxels_bold_mask_wf, [
-                ("bold_file", "inputnode.bold_file"),
-                ("anat_ribbon", "inputnode.anat_ribbon"),
-            ]),
+            (inputnode, goodvoxels_bold_mask_wf, [("anat_ribbon", "inputnode.anat_ribbon")]),
+            (bold_float32, goodvoxels_bold_mask_wf, [("out_file", "inputnode.bold_file")]),
             (goodvoxels_bold_mask_wf, volume_to_surface, [
                 ("outputnode.goodvoxels_mask", "volume_roi"),
             ]),
             (goodvoxels_bold_mask_wf, outputnode, [
                 ("outputnode.goodvoxels_mask", "goodvoxels_mask"),
+                ("outputnode.bold_mean", "bold_mean"),
+                ("outputnode.bold_std", "bold_std"),
+                ("outputnode.bold_cov", "bold_cov"),
             ]),
         ])  # fmt:skip
 